@@ -20,7 +20,7 @@ os.environ['PYTHONPATH'] = PROJECT_ROOT
 sys.path.insert(0, PROJECT_ROOT)
 
 # Now import Flask and other standard libraries
-from flask import Flask, render_template, request, jsonify, url_for
+from flask import Flask, Response, render_template, request, jsonify, url_for
 import subprocess
 import shlex
 
@@ -31,12 +31,15 @@ from blogi.core.config import (
     BLOG_AGENT_NAMES,
     BLOG_RESEARCHER_AI_AGENT, 
     BLOG_ARTIST_AI_AGENT,
-    chaos_percentage_manager,
     OBSIDIAN_AI_POSTS_PATH,
-    ELEVENLABS_API_KEY
+    ELEVENLABS_API_KEY,
+    SSE_KEEPALIVE_INTERVAL
 )
 from blogi.core.agent import BlogAgent
 from blogi.core.deployment import DeploymentManager
+from blogi.core.jobs import JobQueue, JOB_QUEUED
+from blogi.utils.rate_limit import get_limiter
+from blogi.utils.artifacts import get_artifact_store
 
 app = Flask(__name__, static_url_path='/static')
 
@@ -50,7 +53,8 @@ logger.info("Loading Flask application and dependencies...")
 
 # Add this near the top with other config imports
 
-async def execute_generate_command(agent_type, agent_name, topic=None, image_prompt=None, webhook_url=None, chaos_percentage="0"):
+async def execute_generate_command(agent_type, agent_name, topic=None, image_prompt=None, webhook_url=None, chaos_percentage="0",
+                                   event_callback=None, job_id=None):
     """Execute the command using the BlogAgent directly."""
     logger.info("\n=== New Generation Command Started ===")
     logger.info(f"Parameters received:")
@@ -62,9 +66,6 @@ async def execute_generate_command(agent_type, agent_name, topic=None, image_pro
     logger.info(f"  - Chaos Percentage: {chaos_percentage}")
     
     try:
-        # Update the chaos percentage manager
-        chaos_percentage_manager.update(chaos_percentage)
-        
         # Explicitly catch the return values from BlogAgent.create
         try:
             success, message, filepath, filename = await BlogAgent.create(
@@ -72,7 +73,10 @@ async def execute_generate_command(agent_type, agent_name, topic=None, image_pro
                 agent_name=agent_name,
                 topic=topic,
                 image_prompt=image_prompt,
-                webhook_url=webhook_url
+                webhook_url=webhook_url,
+                event_callback=event_callback,
+                chaos_percentage=chaos_percentage,
+                job_id=job_id
             )
         except Exception as e:
             # If BlogAgent.create fails to return proper tuple
@@ -170,60 +174,137 @@ def start_server():
         logger.error(f"Error starting server: {str(e)}", exc_info=True)
         return jsonify({'success': False, 'message': str(e)})
 
+def parse_generate_request(data):
+    """Validate /generate parameters.
+    Returns:
+        Tuple[Optional[dict], Optional[str]]: (execute_generate_command kwargs, error message)
+    """
+    agent_type = data.get('agent_type')
+    agent_name = data.get('agent_name')
+    logger.info(f"Agent type: {agent_type}, Agent name: {agent_name}")
+
+    if agent_type == BLOG_RESEARCHER_AI_AGENT:
+        topic = data.get('topic')
+        if not topic:
+            logger.error("Topic is required for researcher agent but was not provided")
+            return None, 'Topic is required for researcher agent'
+        logger.info(f"Executing researcher command with topic: {topic}")
+        return {'agent_type': agent_type, 'agent_name': agent_name, 'topic': topic}, None
+    elif agent_type == BLOG_ARTIST_AI_AGENT:
+        webhook_url = data.get('webhook_url')
+        if not webhook_url:
+            logger.error("Webhook URL is required for artist agent but was not provided")
+            return None, 'Webhook URL is required for artist agent'
+
+        image_prompt = data.get('image_prompt', None)
+        chaos_percentage = data.get('chaos_percentage', "0")
+
+        logger.info(f"Executing artist command with prompt: {image_prompt}, webhook: {webhook_url}, chaos: {chaos_percentage}")
+        return {
+            'agent_type': agent_type,
+            'agent_name': agent_name,
+            'image_prompt': image_prompt,
+            'webhook_url': webhook_url,
+            'chaos_percentage': chaos_percentage
+        }, None
+
+    return None, f'Invalid agent type: {agent_type}'
+
+async def run_generate_job(job):
+    """Job handler: run one generation, reporting stages and draft tokens as job events."""
+    success, output, filepath, filename = await execute_generate_command(
+        **job.params, event_callback=job.emit, job_id=job.id
+    )
+    logger.info(f"generate Command execution completed - Success: {success}, Output: {output}, Filename: {filename}, Filepath: {filepath}")
+    return {
+        'success': success,
+        'message': output,
+        'filepath': filepath,
+        'filename': filename
+    }
+
+job_queue = JobQueue(run_generate_job)
+
 @app.route('/generate', methods=['POST'])
-async def generate():
+def generate():
+    """Queue a generation and return its job id without waiting for it."""
     try:
         logger.info("Generate endpoint called")
         data = request.get_json()
         logger.info(f"Received data: {data}")
         
-        agent_type = data.get('agent_type')
-        agent_name = data.get('agent_name')
-        logger.info(f"Agent type: {agent_type}, Agent name: {agent_name}")
-        
-        if agent_type == BLOG_RESEARCHER_AI_AGENT:
-            topic = data.get('topic')
-            if not topic:
-                logger.error("Topic is required for researcher agent but was not provided")
-                return jsonify({'success': False, 'message': 'Topic is required for researcher agent'})
-            logger.info(f"Executing researcher command with topic: {topic}")
-            success, output, filepath, filename = await execute_generate_command(agent_type, agent_name, topic=topic)
-        elif agent_type == BLOG_ARTIST_AI_AGENT:
-            webhook_url = data.get('webhook_url')
-            if not webhook_url:
-                logger.error("Webhook URL is required for artist agent but was not provided")
-                return jsonify({'success': False, 'message': 'Webhook URL is required for artist agent'})
-            
-            image_prompt = data.get('image_prompt', None)
-            chaos_percentage = data.get('chaos_percentage', "0")
-            
-            # Update the global chaos percentage
-            chaos_percentage_manager.update(chaos_percentage)
-            
-            logger.info(f"Executing artist command with prompt: {image_prompt}, webhook: {webhook_url}, chaos: {chaos_percentage}")
-            success, output, filepath, filename = await execute_generate_command(
-                agent_type, 
-                agent_name, 
-                image_prompt=image_prompt,
-                webhook_url=webhook_url,
-                chaos_percentage=chaos_percentage
-            )
+        params, error = parse_generate_request(data)
+        if error:
+            return jsonify({'success': False, 'message': error}), 400
 
-        logger.info(f"generate Command execution completed - Success: {success}, Output: {output}, Filename: {filename}, Filepath: {filepath}")
+        job = job_queue.submit(params)
         return jsonify({
-            'success': success,
-            'message': output,
-            'filepath': filepath,
-            'filename': filename
-        })
+            'success': True,
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': url_for('job_status', job_id=job.id),
+            'result_url': url_for('job_result', job_id=job.id),
+            'events_url': url_for('job_events', job_id=job.id)
+        }), 202
     except Exception as e:
         logger.error(f"Error in generate endpoint: {str(e)}", exc_info=True)
-        return jsonify({
-            'success': False,
-            'message': f'Error: {str(e)}',
-            'filepath': None,
-            'filename': None
-        })
+        return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
+
+@app.route('/jobs/stats', methods=['GET'])
+def job_stats():
+    """Queue depth, worker utilization and job counts."""
+    return jsonify(job_queue.stats)
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'message': f'Unknown job: {job_id}'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """The /generate result fields once the job has finished, 202 while it is still pending."""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'message': f'Unknown job: {job_id}'}), 404
+    if not job.finished:
+        return jsonify(job.to_dict()), 202
+    return jsonify({**job.to_dict(), **(job.result or {'success': False, 'message': job.error})})
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Push a job's stage changes and draft tokens as Server-Sent Events.
+
+    Events already emitted are replayed first; the stream ends with a 'done'
+    event carrying the job result.
+    """
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'message': f'Unknown job: {job_id}'}), 404
+
+    def stream():
+        if job.status == JOB_QUEUED:
+            yield format_sse('stage', {'stage': JOB_QUEUED})
+        sent = 0
+        while True:
+            events, sent = job.wait_for_events(sent, SSE_KEEPALIVE_INTERVAL)
+            if not events:
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            for event, payload in events:
+                yield format_sse(event, payload)
+                if event == 'done':
+                    return
+
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 @app.route('/deploy', methods=['POST'])
 async def deploy():
@@ -279,39 +360,30 @@ async def generate_voice():
         original_filename = data.get('filename', '')
         logger.info(f"Original blog post filename: {original_filename}")
         
-        # Load content from config file
-        config_path = Path('tmp/config.json')
-        logger.info(f"Looking for config file at: {config_path} (absolute: {config_path.absolute()})")
-        
-        if not config_path.exists():
-            logger.error(f"Config file not found at: {config_path}")
+        # Look up the post's draft in the artifact store, defaulting to the latest post
+        store = get_artifact_store()
+        if original_filename:
+            artifact = store.get(original_filename)
+        else:
+            recent = store.recent(1)
+            artifact = recent[0] if recent else None
+
+        if not artifact:
+            logger.error(f"No stored artifacts for: {original_filename or 'latest post'}")
             return jsonify({
                 'success': False,
-                'message': 'Config file not found. Please generate a blog post first.'
+                'message': 'No stored blog content found for this post. Please generate a blog post first.'
             })
 
-        # Read the config file
-        try:
-            logger.info("Reading config file...")
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config_data = json.load(f)
-            
-            text = config_data.get('blog_content')
-            if not text:
-                logger.error("No blog content found in config file")
-                return jsonify({
-                    'success': False,
-                    'message': 'No blog content found in config file'
-                })
-            
-            logger.info(f"Successfully loaded blog content (length: {len(text)} characters)")
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse config file: {str(e)}")
+        text = artifact.get('content')
+        if not text:
+            logger.error(f"No blog content stored for {artifact['filename']}")
             return jsonify({
                 'success': False,
-                'message': 'Failed to parse config file'
+                'message': 'No blog content found for this post'
             })
+
+        logger.info(f"Loaded blog content for {artifact['filename']} (length: {len(text)} characters)")
         
         # Clean up the text
         logger.info("Processing text for voice generation...")
@@ -337,7 +409,9 @@ async def generate_voice():
         }
 
         logger.info("Making request to ElevenLabs API...")
-        response = requests.post(url, json=data, headers=headers)
+        async with get_limiter('elevenlabs').limit():
+            # requests blocks, so run it off the event loop
+            response = await asyncio.to_thread(requests.post, url, json=data, headers=headers)
         logger.info(f"ElevenLabs API response status code: {response.status_code}")
         
         if response.status_code != 200:
@@ -353,7 +427,7 @@ async def generate_voice():
         output_dir.mkdir(parents=True, exist_ok=True)
         
         # Generate filename based on original blog post name
-        audio_filename = original_filename.replace('.md', '_voice.mp3')
+        audio_filename = artifact['filename'].replace('.md', '_voice.mp3')
         output_path = output_dir / audio_filename
         logger.info(f"Saving audio file to: {output_path}")
         
@@ -379,6 +453,8 @@ async def generate_voice():
 
 async def cleanup():
     """Cleanup function to properly close async resources."""
+    job_queue.stop()
+    
     tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
     [task.cancel() for task in tasks]
     await asyncio.gather(*tasks, return_exceptions=True)
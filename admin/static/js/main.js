@@ -171,6 +171,79 @@ function appendToConsole(consoleLog, message, className = '') {
     consoleLog.scrollTop = consoleLog.scrollHeight;
 }
 
+// Stage names sent on a job's event stream
+const stageMessages = {
+    'queued': 'Waiting for a free worker...',
+    'running': 'Generation started...',
+    'prompt': 'Generating random image prompt...',
+    'research': 'Researching sources...',
+    'draft': 'Writing draft...',
+    'metadata': 'Generating title, tags and filename...',
+    'save': 'Saving post...',
+    'image': 'Submitting image generation...'
+};
+
+// Poll a job's result until it has finished
+async function pollJobResult(resultUrl) {
+    while (true) {
+        const response = await fetch(resultUrl);
+        if (response.status !== 202) {
+            return response.json();
+        }
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+    }
+}
+
+// Queue a generation job, then follow its Server-Sent Events, showing stages
+// and draft tokens as they arrive. Resolves with the job result fields.
+async function runGenerationJob(requestBody, consoleLog) {
+    const response = await fetch('/generate', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(requestBody)
+    });
+    const job = await response.json();
+    if (!job.success) {
+        throw new Error(job.message || `Server responded with status: ${response.status}`);
+    }
+    appendToConsole(consoleLog, `Queued job ${job.job_id}`);
+
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(job.events_url);
+        let draft = null;
+
+        source.addEventListener('stage', (e) => {
+            const { stage } = JSON.parse(e.data);
+            draft = null;
+            appendToConsole(consoleLog, stageMessages[stage] || `Stage: ${stage}`);
+        });
+
+        source.addEventListener('token', (e) => {
+            if (!draft) {
+                draft = document.createElement('pre');
+                draft.className = 'draft';
+                consoleLog.appendChild(draft);
+            }
+            draft.textContent += JSON.parse(e.data).text;
+            consoleLog.scrollTop = consoleLog.scrollHeight;
+        });
+
+        source.addEventListener('done', (e) => {
+            source.close();
+            resolve(JSON.parse(e.data));
+        });
+
+        source.onerror = () => {
+            // The job keeps running on the server; fall back to polling for its result
+            source.close();
+            appendToConsole(consoleLog, 'Lost the progress stream, waiting for the result...');
+            pollJobResult(job.result_url).then(resolve, reject);
+        };
+    });
+}
+
 // Function to save form values to localStorage
 function saveFormValues() {
     const formData = {
@@ -482,55 +555,28 @@ document.addEventListener('DOMContentLoaded', () => {
 
             appendToConsole(consoleLog, 'Sending request to server...');
             
-            // Add timeout to the fetch request
-            const controller = new AbortController();
-            const timeout = setTimeout(() => controller.abort(), 600000); // 10 minute timeout
-
-            try {
-                const response = await fetch('/generate', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json'
-                    },
-                    body: JSON.stringify(requestBody),
-                    signal: controller.signal
-                });
-
-                clearTimeout(timeout);
-
-                if (!response.ok) {
-                    throw new Error(`Server responded with status: ${response.status}`);
+            const data = await runGenerationJob(requestBody, consoleLog);
+            
+            if (data.success) {
+                // Show success message with any additional information
+                let successMessage = data.message || 'Post generated successfully!';
+                if (data.details) {
+                    successMessage += '\n\nDetails:\n' + data.details;
                 }
-
-                appendToConsole(consoleLog, 'Response received from server...');
-                const data = await response.json();
+                appendToConsole(consoleLog, successMessage, 'success');
                 
-                if (data.success) {
-                    // Show success message with any additional information
-                    let successMessage = data.message || 'Post generated successfully!';
-                    if (data.details) {
-                        successMessage += '\n\nDetails:\n' + data.details;
-                    }
-                    appendToConsole(consoleLog, successMessage, 'success');
-                    
-                    // Handle filename display and deploy button
-                    if (data.filename) {
-                        const filenameElement = document.getElementById('filename');
-                        filenameElement.textContent = data.filename;
-                        document.getElementById('filename-container').classList.remove('hidden');
-                        appendToConsole(consoleLog, `Blog Post generated successfully: ${data.filename}`);
-                        // Show both buttons when filename is displayed
-                        document.getElementById('voiceOverButton').classList.remove('hidden');
-                        deployButton.classList.remove('hidden');
-                    }
-                } else {
-                    throw new Error(data.message || 'Unknown server error');
-                }
-            } catch (fetchError) {
-                if (fetchError.name === 'AbortError') {
-                    throw new Error('Request timed out after 10 minutes. Please try again.');
+                // Handle filename display and deploy button
+                if (data.filename) {
+                    const filenameElement = document.getElementById('filename');
+                    filenameElement.textContent = data.filename;
+                    document.getElementById('filename-container').classList.remove('hidden');
+                    appendToConsole(consoleLog, `Blog Post generated successfully: ${data.filename}`);
+                    // Show both buttons when filename is displayed
+                    document.getElementById('voiceOverButton').classList.remove('hidden');
+                    deployButton.classList.remove('hidden');
                 }
-                throw fetchError;
+            } else {
+                throw new Error(data.message || 'Unknown server error');
             }
         } catch (error) {
             console.error('Error during post generation:', error);
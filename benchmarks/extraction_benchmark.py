@@ -0,0 +1,90 @@
+"""Compare the HTML extraction engines on a saved corpus of pages.
+
+Usage:
+    python -m blogi.benchmarks.extraction_benchmark CORPUS_DIR [--fetch URLS_FILE] [--repeat N]
+
+CORPUS_DIR holds raw *.html files. With --fetch, each URL in URLS_FILE (one per
+line) is downloaded into CORPUS_DIR first. Every page is run through the old
+whole-document BeautifulSoup path and through the configured streaming path
+(chunked input with the HTML_MAX_BYTES cap), and the timings are printed.
+"""
+import argparse
+import codecs
+import hashlib
+import statistics
+import time
+from pathlib import Path
+
+import requests
+
+from blogi.core.config import HTML_MAX_BYTES, HTML_CHUNK_SIZE
+from blogi.core.extraction import SoupExtractor, StreamingExtractor
+
+def fetch_corpus(urls_file: Path, corpus_dir: Path):
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+    for url in urls_file.read_text().split():
+        target = corpus_dir / f"{hashlib.sha1(url.encode()).hexdigest()[:12]}.html"
+        if target.exists():
+            continue
+        try:
+            response = requests.get(url, headers=headers, timeout=30)
+            response.raise_for_status()
+            target.write_bytes(response.content)
+            print(f"saved {url} -> {target.name}")
+        except Exception as e:
+            print(f"skipped {url}: {e}")
+
+def run_soup(raw: bytes) -> str:
+    return SoupExtractor().extract(raw.decode('utf-8', errors='replace'))
+
+def run_streaming(raw: bytes) -> str:
+    extractor = StreamingExtractor()
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    received = 0
+    for start in range(0, len(raw), HTML_CHUNK_SIZE):
+        chunk = raw[start:start + HTML_CHUNK_SIZE][:HTML_MAX_BYTES - received]
+        received += len(chunk)
+        if extractor.feed(decoder.decode(chunk)) or received >= HTML_MAX_BYTES:
+            break
+    return extractor.result()
+
+def time_engine(engine, raw: bytes, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = engine(raw)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), text
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML extraction engines')
+    parser.add_argument('corpus_dir', type=Path, help='Directory of saved *.html pages')
+    parser.add_argument('--fetch', type=Path, help='File of URLs to download into the corpus first')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per page (median is reported)')
+    args = parser.parse_args()
+
+    if args.fetch:
+        fetch_corpus(args.fetch, args.corpus_dir)
+
+    pages = sorted(args.corpus_dir.glob('*.html'))
+    if not pages:
+        parser.error(f"No *.html files found in {args.corpus_dir}")
+
+    print(f"{'page':<24}{'KiB':>8}{'soup ms':>10}{'stream ms':>11}{'speedup':>9}{'same prefix':>13}")
+    soup_total = stream_total = 0.0
+    for page in pages:
+        raw = page.read_bytes()
+        soup_time, soup_text = time_engine(run_soup, raw, args.repeat)
+        stream_time, stream_text = time_engine(run_streaming, raw, args.repeat)
+        soup_total += soup_time
+        stream_total += stream_time
+        same = soup_text[:200] == stream_text[:200]
+        print(f"{page.name[:23]:<24}{len(raw) / 1024:>8.0f}{soup_time * 1000:>10.1f}"
+              f"{stream_time * 1000:>11.1f}{soup_time / stream_time:>8.1f}x{str(same):>13}")
+
+    print(f"\n{len(pages)} pages: soup {soup_total * 1000:.1f} ms, streaming {stream_total * 1000:.1f} ms "
+          f"({soup_total / stream_total:.1f}x faster)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Compare grid slicing pipelines on 2048x2048 Midjourney-style grids.
+
+Usage:
+    python -m blogi.benchmarks.slicing_benchmark [GRID.png ...] [--count N] [--workers N] [--repeat N]
+
+Without grid files, N synthetic 2048x2048 RGBA grids are generated (smooth
+gradients plus noise, so PNG encoding does realistic work). Each grid is
+sliced by the previous one-at-a-time code (crop, save, full-resolution
+LANCZOS thumbnail, save) and by utils.image_slicing.slice_grid inline and on
+a process pool, first with the same eight PNG outputs and then with the
+WebP/AVIF variants as well; the median time per grid is printed.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from blogi.utils.image_slicing import POSITIONS, make_slice_pool, quadrant_boxes, slice_grid, thumbnail_size
+
+def make_grid(path: Path, size: int = 2048):
+    gradient = Image.linear_gradient('L').resize((size, size))
+    noise = Image.effect_noise((size, size), 48)
+    image = Image.merge('RGBA', (gradient, noise, gradient.rotate(90), Image.new('L', (size, size), 255)))
+    image.save(path)
+
+def slice_sequential(grid_path: Path, output_dir: Path):
+    """The original slice_and_save_images loop."""
+    img = Image.open(grid_path)
+    base_name = grid_path.stem
+    for coords, position in zip(quadrant_boxes(*img.size), POSITIONS):
+        quadrant = img.crop(coords)
+        quadrant.save(output_dir / f"{base_name}_{position}.png")
+        thumbnail = quadrant.resize(thumbnail_size(quadrant.size), Image.Resampling.LANCZOS)
+        thumbnail.save(output_dir / f"{base_name}_{position}_thumb.png")
+    img.close()
+
+def time_pipeline(run, grids, output_dir: Path, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        for grid in grids:
+            start = time.perf_counter()
+            run(grid, output_dir)
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark grid slicing pipelines')
+    parser.add_argument('grids', type=Path, nargs='*', help='Grid PNGs to slice (default: synthetic grids)')
+    parser.add_argument('--count', type=int, default=3, help='Synthetic grids to generate')
+    parser.add_argument('--workers', type=int, default=min(8, os.cpu_count() or 1), help='Pool processes')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per grid (median is reported)')
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix='slicing-benchmark-'))
+    try:
+        grids = args.grids
+        if not grids:
+            grids = [workdir / f"grid-{n}.png" for n in range(args.count)]
+            for grid in grids:
+                make_grid(grid)
+        output_dir = workdir / 'out'
+        output_dir.mkdir()
+
+        with make_slice_pool(args.workers) as pool:
+            # Start the pool processes outside the timed runs
+            list(pool.map(abs, range(args.workers)))
+            pipelines = [
+                ('sequential', slice_sequential),
+                ('single decode, inline', lambda grid, out: slice_grid(grid, out, pool=None, variants=False)),
+                (f'single decode, {args.workers} processes',
+                 lambda grid, out: slice_grid(grid, out, pool=pool, variants=False)),
+                (f'+ variants, {args.workers} processes', lambda grid, out: slice_grid(grid, out, pool=pool)),
+            ]
+            results = [(name, time_pipeline(run, grids, output_dir, args.repeat)) for name, run in pipelines]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = results[0][1]
+    print(f"{len(grids)} grids, {os.cpu_count()} CPUs")
+    print(f"{'pipeline':<32}{'ms/grid':>10}{'speedup':>9}")
+    for name, seconds in results:
+        print(f"{name:<32}{seconds * 1000:>10.0f}{baseline / seconds:>8.1f}x")
+
+if __name__ == '__main__':
+    main()
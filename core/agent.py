@@ -1,10 +1,13 @@
 import os
+import re
+import json
+import asyncio
 import logging
 import anthropic
 import aiohttp
 import aiofiles
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Callable, Optional, Tuple, Dict, List
 from datetime import datetime
 from dotenv import load_dotenv
 from contextlib import asynccontextmanager
@@ -15,11 +18,13 @@ from openai import OpenAI
 from blogi.services.anthropic_service import AnthropicService
 from blogi.services.brave_search_service import BraveSearchClient
 from blogi.core.web_service import WebService
+from blogi.core.templates import templates
 from blogi.generators.artist import ArtistPostGenerator
 from blogi.generators.researcher import ResearcherPostGenerator
 from blogi.services.process_image_service import ProcessImageService
 from blogi.utils.validation import verify_paths, check_dependencies
 from blogi.utils.path_utils import ensure_directory_structure
+from blogi.utils.artifacts import get_artifact_store
 from blogi.services.openai_random_image_prompt_service import OpenAIRandomImagePromptService
 from blogi.services.midjourney_image_service import MidjourneyImageService
 
@@ -31,10 +36,14 @@ from blogi.core.config import (
         BLOG_ARTIST_AI_AGENT, 
         OBSIDIAN_AI_POSTS_PATH, 
         PROMPTS_DIR,
-        BLOG_ARTIST_RANDOM_PROMPT_ARTIST
+        BLOG_ARTIST_RANDOM_PROMPT_ARTIST,
+        METADATA_MODE,
+        BATCH_STATE_DIR,
+        MIDJOURNEY_CHAOS_PERCENTAGE
     )
 
-async def generate_blog_image(image_prompt: str, webhook_url: str) -> None:
+async def generate_blog_image(image_prompt: str, webhook_url: str, image_filename: str,
+                              chaos_percentage: str = MIDJOURNEY_CHAOS_PERCENTAGE) -> None:
     """Generate blog image using Midjourney service."""
     if not image_prompt or not webhook_url:
         return
@@ -49,7 +58,9 @@ async def generate_blog_image(image_prompt: str, webhook_url: str) -> None:
             api_key=api_key,
             account_hash=account_hash,
             prompt=image_prompt,
-            webhook_url=webhook_url
+            webhook_url=webhook_url,
+            image_filename=image_filename,
+            chaos_percentage=chaos_percentage
         )
         await image_service.run_async()
     except Exception as e:
@@ -58,7 +69,9 @@ async def generate_blog_image(image_prompt: str, webhook_url: str) -> None:
 class BlogAgent:
     def __init__(self, agent_name: str, agent_type: str, topic: Optional[str] = None, 
                  image_prompt: Optional[str] = None, webhook_url: Optional[str] = None,
-                 model: str = CLAUDE_MODEL):
+                 model: str = CLAUDE_MODEL, event_callback: Optional[Callable[..., None]] = None,
+                 chaos_percentage: str = MIDJOURNEY_CHAOS_PERCENTAGE, job_id: Optional[str] = None,
+                 web_service: Optional[WebService] = None):
         
         logger.info("\n=== Initializing BlogAgent ===")
         logger.info(f"Parameters:")
@@ -71,13 +84,19 @@ class BlogAgent:
         self._validate_agent_type(agent_type)
         self._validate_requirements(agent_type, topic, webhook_url)
         
-        self.web_service = WebService()
+        # Callers that never fetch pages can pass WebService(use_cache=False) to skip the page cache
+        self.web_service = web_service or WebService()
         self.agent_name = agent_name
         self.agent_type = agent_type
         self.topic = topic
         self.image_prompt = image_prompt
         self.webhook_url = webhook_url
         self.model = model
+        self.chaos_percentage = chaos_percentage
+        # Groups this post's artifacts with the job that produced it
+        self.job_id = job_id
+        # Receives progress events (stage changes, draft tokens) for streaming UIs
+        self.event_callback = event_callback
         
         # Initialize as None
         self.sessions = []
@@ -127,6 +146,7 @@ class BlogAgent:
         self.title_prompt_path = self.common_prompts_path / "summarize_for_title.txt"
         self.five_words_prompt_path = self.common_prompts_path / "five_word_summary.txt"
         self.summarize_content_path = self.common_prompts_path / "summarize_content.txt"
+        self.metadata_prompt_path = self.common_prompts_path / "metadata_prompt.txt"
 
     @classmethod
     async def create(cls,
@@ -134,8 +154,15 @@ class BlogAgent:
                     agent_name: str,
                     topic: str = None,
                     image_prompt: str = None,
-                    webhook_url: str = None):
-        """Create a new blog post using the specified agent type and parameters."""
+                    webhook_url: str = None,
+                    event_callback: Optional[Callable[..., None]] = None,
+                    chaos_percentage: str = MIDJOURNEY_CHAOS_PERCENTAGE,
+                    job_id: Optional[str] = None):
+        """Create a new blog post using the specified agent type and parameters.
+
+        event_callback, if given, is called as event_callback(event, **data)
+        with 'stage' and 'token' events while the post is generated.
+        """
         try:
             logger.info(f"\n=== BlogAgent.create Started ===")
             logger.info(f"Parameters:")
@@ -150,6 +177,8 @@ class BlogAgent:
                 logger.info("No image prompt provided, generating random prompt...")
                 prompt_service = OpenAIRandomImagePromptService()
                 try:
+                    if event_callback:
+                        event_callback('stage', stage='prompt')
                     image_prompt = await prompt_service.generate_random_prompt()
                     if not image_prompt:
                         raise ValueError("Failed to generate random image prompt")
@@ -164,7 +193,10 @@ class BlogAgent:
                 agent_name=agent_name,
                 topic=topic,
                 image_prompt=image_prompt,
-                webhook_url=webhook_url
+                webhook_url=webhook_url,
+                event_callback=event_callback,
+                chaos_percentage=chaos_percentage,
+                job_id=job_id
             )
             
             # Use context manager to handle initialization and cleanup
@@ -179,10 +211,15 @@ class BlogAgent:
                 filename, blog_page = await generator.generate_blog_post()
                 
                 # Save the blog post
+                agent.emit('stage', stage='save')
                 filepath = await agent.save_to_obsidian_notes(filename, blog_page)
+                if filepath:
+                    get_artifact_store().save(filename, filepath=str(filepath))
 
                 # Generate the images AFTER the blog post is saved
-                await generate_blog_image(image_prompt, webhook_url)
+                if image_prompt and webhook_url:
+                    agent.emit('stage', stage='image')
+                await generate_blog_image(image_prompt, webhook_url, filename, chaos_percentage)
 
                     
                 if filepath:
@@ -195,6 +232,24 @@ class BlogAgent:
             logger.error(error_msg)
             return False, error_msg, None, None
 
+    @classmethod
+    async def create_batch(cls, items: List[Dict], state_path: Optional[Path] = None) -> Dict[str, Dict]:
+        """Generate many blog posts through the Message Batches API.
+
+        Args:
+            items: Dicts with 'id', 'agent_type', 'agent_name' and the same
+                topic/image_prompt/webhook_url arguments as create()
+            state_path: Progress file; rerunning with the same file resumes the run
+        Returns:
+            Dict[str, Dict]: Per-post state keyed by id ('stage' is 'done' or 'failed')
+        """
+        # Imported here since core.batch builds on BlogAgent
+        from blogi.core.batch import BatchPostRunner
+
+        state_path = state_path or BATCH_STATE_DIR / f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        logger.info(f"\n=== BlogAgent.create_batch Started: {len(items)} posts, state {state_path} ===")
+        return await BatchPostRunner(items, state_path).run()
+
     def _validate_initialization(self):
         if not os.getenv('ANTHROPIC_API_KEY'):
             raise ValueError("ANTHROPIC_API_KEY not found in environment variables")
@@ -222,17 +277,14 @@ class BlogAgent:
             raise RuntimeError("Agent has been closed")
             
         try:
-            # Create main session
-            main_session = await self.create_session()
+            # Attach to the process-wide pooled HTTP session
+            await self.web_service.start()
             
             # Initialize services
             self.anthropic = AnthropicService(self.model)
-            if hasattr(self.anthropic, 'session'):
-                self.anthropic.session = await self.create_session()
             
             if self.agent_type == BLOG_RESEARCHER_AI_AGENT:
-                self.brave_client = BraveSearchClient()
-                self.brave_client.session = await self.create_session()
+                self.brave_client = BraveSearchClient(session=self.web_service.session)
         except Exception as e:
             logger.error(f"Error initializing services: {str(e)}")
             await self.cleanup()
@@ -260,7 +312,12 @@ class BlogAgent:
                     errors.append(f"Error cleaning up brave client: {str(e)}")
                 self.brave_client = None
 
-            # Then close all tracked sessions
+            # Release the shared HTTP pool, then close any sessions we created
+            try:
+                await self.web_service.close()
+            except Exception as e:
+                errors.append(f"Error releasing shared session: {str(e)}")
+
             for session in self.sessions:
                 if session and not session.closed:
                     try:
@@ -295,6 +352,37 @@ class BlogAgent:
             logger.error(f"Error during generation: {str(e)}")
             return None
 
+    def emit(self, event: str, **data):
+        """Report a progress event to the event callback, if any."""
+        if not self.event_callback:
+            return
+        try:
+            self.event_callback(event, **data)
+        except Exception as e:
+            logger.error(f"Error in event callback: {str(e)}")
+
+    def record_artifacts(self, filename: str, content: str, metadata: Dict[str, str]):
+        """Store a post's draft and metadata so later stages can look it up by filename."""
+        try:
+            get_artifact_store().save(
+                filename,
+                job_id=self.job_id,
+                agent_type=self.agent_type,
+                title=metadata.get('title'),
+                content=content,
+                metadata=metadata,
+                image_prompt=self.image_prompt
+            )
+        except Exception as e:
+            logger.error(f"Error saving artifacts for {filename}: {str(e)}")
+
+    async def write_draft(self, prompt: str) -> str:
+        """Ask for the post draft, streaming its tokens as 'token' events when someone is listening."""
+        self.emit('stage', stage='draft')
+        if not self.event_callback:
+            return await self.anthropic.ask(prompt)
+        return await self.anthropic.ask_streaming(prompt, lambda text: self.emit('token', text=text))
+
     async def read_file(self, filepath: str) -> Optional[str]:
         """Read a file asynchronously."""
         try:
@@ -304,6 +392,70 @@ class BlogAgent:
             logger.error(f"Error reading file {filepath}: {str(e)}")
             return None
 
+    async def generate_metadata(self, content: str) -> Dict[str, str]:
+        """Generate title, tags and filename summary for the content.
+
+        In "fused" mode a single JSON completion returns all three fields; if
+        that fails (or METADATA_MODE is "separate") the three dedicated
+        prompts are sent concurrently instead.
+        """
+        if METADATA_MODE == "fused":
+            metadata = await self._generate_fused_metadata(content)
+            if metadata:
+                return metadata
+            logger.warning("Fused metadata generation failed, falling back to separate calls")
+
+        title, tags, filename = await asyncio.gather(
+            self.generate_title(content),
+            self.generate_tags(content),
+            self.generate_filename(content)
+        )
+        return {'title': title, 'tags': tags, 'filename': filename}
+
+    async def _generate_fused_metadata(self, content: str) -> Optional[Dict[str, str]]:
+        """Request all metadata fields in one structured completion."""
+        if not content:
+            return None
+
+        try:
+            prompt = templates.get(self.metadata_prompt_path)
+            response = await self.anthropic.ask(prompt.format(content=content))
+            return self.parse_metadata_response(response)
+        except Exception as e:
+            logger.error(f"Fused metadata generation error: {str(e)}")
+            return None
+
+    @classmethod
+    def parse_metadata_response(cls, response: str) -> Optional[Dict[str, str]]:
+        """Turn a metadata_prompt JSON reply into title/tags/filename, or None if malformed."""
+        match = re.search(r'\{.*\}', response or "", re.DOTALL)
+        if not match:
+            return None
+
+        try:
+            data = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return None
+        title, tags, five_words = data.get('title'), data.get('tags'), data.get('five_words')
+        if not (title and isinstance(tags, list) and tags and five_words):
+            return None
+
+        return {
+            'title': cls._clean_title(title),
+            'tags': json.dumps([str(tag) for tag in tags]),
+            'filename': cls._format_five_words(five_words)
+        }
+
+    @staticmethod
+    def _clean_title(response: str) -> str:
+        return response.replace('"', "").strip()
+
+    @staticmethod
+    def _format_five_words(response: str) -> str:
+        summary = response.strip().replace(' ', '-')
+        words = summary.split('-')
+        return '-'.join(words[:5] if len(words) > 5 else words + ['Update'] * (5 - len(words)))
+
     async def generate_title(self, content: str) -> str:
         """Generate a title from the content."""
         default_title = "Default Title Post Is Here"
@@ -311,9 +463,9 @@ class BlogAgent:
             return default_title
             
         try:
-            prompt = await self.read_file(str(self.title_prompt_path))
+            prompt = templates.get(self.title_prompt_path)
             response = await self.anthropic.ask(prompt.format(content=content))
-            return f'{response.replace('"', "").strip()}' if response else default_title
+            return self._clean_title(response) if response else default_title
         except Exception as e:
             logger.error(f"Title generation error: {str(e)}")
             return default_title
@@ -322,12 +474,10 @@ class BlogAgent:
         """Generate a 5-word summary for use in the filename."""
         default_title = "Default-Title-Post-Is-Here"
         try:
-            prompt = await self.read_file(str(self.five_words_prompt_path))
+            prompt = templates.get(self.five_words_prompt_path)
             response = await self.anthropic.ask(prompt.format(content=content))
             if response:
-                summary = response.strip().replace(' ', '-')
-                words = summary.split('-')
-                return '-'.join(words[:5] if len(words) > 5 else words + ['Update'] * (5 - len(words)))
+                return self._format_five_words(response)
             return default_title
         except Exception as e:
             logger.error(f"Title summary generation error: {str(e)}")
@@ -336,7 +486,7 @@ class BlogAgent:
     async def generate_tags(self, content: str) -> str:
         """Generate tags for the content."""
         try:
-            tags_prompt = await self.read_file(str(self.tags_prompt_path))
+            tags_prompt = templates.get(self.tags_prompt_path)
             return await self.anthropic.ask(tags_prompt.format(content=content))
         except Exception as e:
             logger.error(f"Tags generation error: {str(e)}")
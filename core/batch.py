@@ -0,0 +1,344 @@
+import os
+import re
+import json
+import asyncio
+import hashlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import anthropic
+
+from blogi.core.config import (
+    logger,
+    CLAUDE_MODEL,
+    BLOG_ARTIST_AI_AGENT,
+    BLOG_RESEARCHER_AI_AGENT,
+    BLOG_ARTIST_RANDOM_PROMPT_ARTIST,
+    MAX_SEARCH_RESULTS,
+    RESEARCH_CONCURRENCY,
+    BATCH_POLL_INTERVAL,
+    BATCH_API_BASE_URL,
+    MIDJOURNEY_CHAOS_PERCENTAGE
+)
+from blogi.core.agent import BlogAgent, generate_blog_image
+from blogi.core.templates import templates
+from blogi.core.web_service import WebService
+from blogi.generators.artist import ArtistPostGenerator
+from blogi.generators.researcher import ResearcherPostGenerator
+from blogi.services.anthropic_service import SYSTEM_PROMPT, DEFAULT_MAX_TOKENS
+from blogi.services.brave_search_service import BraveSearchClient
+from blogi.services.openai_random_image_prompt_service import OpenAIRandomImagePromptService
+from blogi.utils.artifacts import get_artifact_store
+
+# Pipeline stages in order. "research" (search + page fetch) and "assemble"
+# (format + save) run locally; the others are sent through the Batches API.
+STAGES = ['research', 'summaries', 'drafts', 'metadata', 'assemble', 'done']
+BATCHED_STAGES = ['summaries', 'drafts', 'metadata']
+# custom_id suffix of the single request a post sends in a stage
+REQUEST_SUFFIX = {'drafts': 'draft', 'metadata': 'metadata'}
+# The Batches API only accepts custom_ids matching this pattern
+CUSTOM_ID_PATTERN = re.compile(r'^[a-zA-Z0-9_-]{1,64}$')
+# Longest item id used verbatim in a custom_id, leaving room for "-summary-<index>"
+MAX_ITEM_KEY_LENGTH = 40
+
+def request_key(item_id: str) -> str:
+    """The item's part of its custom_ids: the id itself when it is short and
+    only uses allowed characters, otherwise a hash of it."""
+    if len(item_id) <= MAX_ITEM_KEY_LENGTH and CUSTOM_ID_PATTERN.match(item_id):
+        return item_id
+    return f"item_{hashlib.sha256(item_id.encode('utf-8')).hexdigest()[:24]}"
+
+def custom_id(item_id: str, *parts: Any) -> str:
+    """Build the custom_id of one of an item's requests, e.g. custom_id('42', 'summary', 0) -> '42-summary-0'."""
+    return '-'.join([request_key(item_id)] + [str(part) for part in parts])
+
+class BatchPostRunner:
+    """Generate many posts through the Anthropic Message Batches API.
+
+    Every stage is submitted as one batch covering all posts that reached it,
+    so a backfill of N posts costs three batches instead of ~5N synchronous
+    calls. Progress (batch ids, research, drafts, metadata) is written to a
+    JSON state file after every step, so an interrupted run picks up where it
+    stopped when started again with the same state file.
+    """
+
+    def __init__(self, items: List[Dict[str, Any]], state_path: Path,
+                 model: str = CLAUDE_MODEL, client: Optional[anthropic.AsyncAnthropic] = None,
+                 poll_interval: float = BATCH_POLL_INTERVAL):
+        """
+        Args:
+            items: Post requests with 'id', 'agent_type', 'agent_name' and
+                'topic' or 'image_prompt'/'webhook_url'
+            state_path: JSON file used to persist progress between runs
+            model: Model used for every batched request
+            client: Anthropic client; defaults to one pointed at BATCH_API_BASE_URL
+            poll_interval: Seconds between batch status checks
+        """
+        self.state_path = Path(state_path)
+        self.model = model
+        self.client = client or anthropic.AsyncAnthropic(base_url=BATCH_API_BASE_URL)
+        self.poll_interval = poll_interval
+        self.state = self._load_state()
+        self._generators: Dict[str, Any] = {}
+
+        for item in items:
+            item_id = str(item['id'])
+            if item_id not in self.state['posts']:
+                self.state['posts'][item_id] = {'item': item, 'stage': 'research'}
+        self._save_state()
+
+    @property
+    def _batches(self):
+        # Message Batches moved out of beta in newer SDK releases
+        messages = self.client.messages
+        return getattr(messages, 'batches', None) or self.client.beta.messages.batches
+
+    def _load_state(self) -> Dict[str, Any]:
+        if self.state_path.exists():
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            logger.info(f"Resuming batch run from {self.state_path}")
+            return state
+        return {'posts': {}, 'batches': {}}
+
+    def _save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _posts_at(self, stage: str) -> Dict[str, Dict[str, Any]]:
+        return {item_id: post for item_id, post in self.state['posts'].items() if post['stage'] == stage}
+
+    def _advance(self, post: Dict[str, Any], stage: str):
+        post['stage'] = stage
+
+    def _fail(self, item_id: str, error: str):
+        logger.error(f"Batch post {item_id} failed: {error}")
+        post = self.state['posts'][item_id]
+        post['stage'] = 'failed'
+        post['error'] = error
+
+    async def run(self) -> Dict[str, Dict[str, Any]]:
+        """Run every remaining stage and return the per-post state."""
+        await self._research()
+        for stage in BATCHED_STAGES:
+            await self._run_batched_stage(stage)
+        await self._assemble()
+
+        done = len(self._posts_at('done'))
+        failed = len(self._posts_at('failed'))
+        logger.info(f"Batch run finished: {done} posts done, {failed} failed")
+        return self.state['posts']
+
+    def _generator(self, item_id: str):
+        """Build (once per run) the agent and generator that own a post's templates and paths."""
+        if item_id not in self._generators:
+            item = self.state['posts'][item_id]['item']
+            agent = BlogAgent(
+                agent_type=item['agent_type'],
+                agent_name=item['agent_name'],
+                topic=item.get('topic'),
+                image_prompt=item.get('image_prompt'),
+                webhook_url=item.get('webhook_url'),
+                job_id=item_id,
+                # Pages are fetched by _research, so the agent needs no page cache (and its SQLite connection)
+                web_service=WebService(use_cache=False)
+            )
+            generator = (
+                ArtistPostGenerator(agent) if item['agent_type'] == BLOG_ARTIST_AI_AGENT
+                else ResearcherPostGenerator(agent)
+            )
+            generator.templates = generator._load_templates()
+            self._generators[item_id] = generator
+        return self._generators[item_id]
+
+    async def _research(self):
+        """Search and fetch sources for researcher posts; artist posts skip ahead to drafts."""
+        pending = self._posts_at('research')
+        if not pending:
+            return
+
+        web_service = WebService()
+        await web_service.start()
+        brave_client = None
+        semaphore = asyncio.Semaphore(RESEARCH_CONCURRENCY)
+
+        async def fetch_source(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                content = await web_service.fetch_webpage_content(result['url'])
+            if not content:
+                return None
+            return {
+                'title': result.get('title', ''),
+                'url': result.get('url', ''),
+                'description': result.get('description', ''),
+                'content': content
+            }
+
+        try:
+            for item_id, post in pending.items():
+                item = post['item']
+                if item['agent_type'] == BLOG_ARTIST_AI_AGENT:
+                    if item['agent_name'] == BLOG_ARTIST_RANDOM_PROMPT_ARTIST and not item.get('image_prompt'):
+                        item['image_prompt'] = await OpenAIRandomImagePromptService().generate_random_prompt()
+                        if not item['image_prompt']:
+                            self._fail(item_id, "Failed to generate random image prompt")
+                            continue
+                    self._advance(post, 'drafts')
+                    continue
+
+                try:
+                    brave_client = brave_client or BraveSearchClient(session=web_service.session)
+                    search_results = await brave_client.search(item['topic'])
+                    sources = await asyncio.gather(*[
+                        fetch_source(result) for result in search_results[:MAX_SEARCH_RESULTS]
+                    ])
+                    post['sources'] = [source for source in sources if source]
+                    self._advance(post, 'summaries')
+                except Exception as e:
+                    self._fail(item_id, f"Research failed: {str(e)}")
+                self._save_state()
+        finally:
+            self._save_state()
+            if brave_client:
+                await brave_client.cleanup()
+            await web_service.close()
+
+    def _build_requests(self, stage: str, posts: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        requests = []
+
+        def add(request_id: str, prompt: str):
+            requests.append({
+                'custom_id': request_id,
+                'params': {
+                    'model': self.model,
+                    'max_tokens': DEFAULT_MAX_TOKENS,
+                    'system': SYSTEM_PROMPT,
+                    'messages': [{'role': 'user', 'content': prompt.strip()}]
+                }
+            })
+
+        for item_id, post in posts.items():
+            generator = self._generator(item_id)
+            if stage == 'summaries':
+                for index, source in enumerate(post.get('sources', [])):
+                    add(custom_id(item_id, 'summary', index), generator.build_summary_prompt(source['content']))
+            elif stage == 'drafts':
+                if post['item']['agent_type'] == BLOG_RESEARCHER_AI_AGENT:
+                    add(custom_id(item_id, REQUEST_SUFFIX[stage]), generator.build_draft_prompt(post.get('sources', [])))
+                else:
+                    generator.agent.image_prompt = post['item'].get('image_prompt')
+                    add(custom_id(item_id, REQUEST_SUFFIX[stage]), generator.build_draft_prompt())
+            elif stage == 'metadata':
+                metadata_prompt = templates.get(generator.agent.metadata_prompt_path)
+                add(custom_id(item_id, REQUEST_SUFFIX[stage]), metadata_prompt.format(
+                    content=generator.metadata_source(post['draft'])
+                ))
+        return requests
+
+    async def _run_batched_stage(self, stage: str):
+        next_stage = STAGES[STAGES.index(stage) + 1]
+        posts = self._posts_at(stage)
+        batch = self.state['batches'].get(stage)
+
+        if batch is None:
+            if not posts:
+                return
+            requests = self._build_requests(stage, posts)
+            if not requests:
+                for post in posts.values():
+                    self._advance(post, next_stage)
+                self._save_state()
+                return
+
+            created = await self._batches.create(requests=requests)
+            batch = {'id': created.id, 'items': list(posts)}
+            self.state['batches'][stage] = batch
+            self._save_state()
+            logger.info(f"Submitted {stage} batch {created.id} with {len(requests)} requests")
+
+        await self._wait_for(batch['id'], stage)
+        await self._apply_results(stage, batch, next_stage)
+
+        del self.state['batches'][stage]
+        self._save_state()
+
+    async def _wait_for(self, batch_id: str, stage: str):
+        while True:
+            batch = await self._batches.retrieve(batch_id)
+            if batch.processing_status == 'ended':
+                logger.info(f"{stage} batch {batch_id} ended: {batch.request_counts}")
+                return
+            logger.info(f"{stage} batch {batch_id} is {batch.processing_status}: {batch.request_counts}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _apply_results(self, stage: str, batch: Dict[str, Any], next_stage: str):
+        texts: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        async for entry in await self._batches.results(batch['id']):
+            if entry.result.type == 'succeeded':
+                texts[entry.custom_id] = entry.result.message.content[0].text
+            else:
+                errors[entry.custom_id] = entry.result.type
+
+        for item_id in batch['items']:
+            post = self.state['posts'].get(item_id)
+            if not post or post['stage'] != stage:
+                continue
+
+            if stage == 'summaries':
+                for index, source in enumerate(post.get('sources', [])):
+                    source['content_summary'] = texts.get(custom_id(item_id, 'summary', index), '')
+                self._advance(post, next_stage)
+                continue
+
+            request_id = custom_id(item_id, REQUEST_SUFFIX[stage])
+            text = texts.get(request_id)
+            if not text:
+                self._fail(item_id, f"{stage} request {errors.get(request_id, 'returned no content')}")
+                continue
+
+            if stage == 'drafts':
+                post['draft'] = text
+            else:
+                metadata = BlogAgent.parse_metadata_response(text)
+                if not metadata:
+                    self._fail(item_id, "metadata response could not be parsed")
+                    continue
+                post['metadata'] = metadata
+            self._advance(post, next_stage)
+
+    async def _assemble(self):
+        """Format and save every post whose batched stages have completed."""
+        for item_id, post in self._posts_at('assemble').items():
+            try:
+                generator = self._generator(item_id)
+                item = post['item']
+                metadata = dict(post['metadata'], date=datetime.now().strftime('%Y-%m-%d'))
+                if item['agent_type'] == BLOG_ARTIST_AI_AGENT:
+                    generator.agent.image_prompt = item.get('image_prompt')
+
+                filename, blog_page = await generator.assemble_post(post['draft'], metadata)
+                filepath = await generator.agent.save_to_obsidian_notes(filename, blog_page)
+                if not filepath:
+                    self._fail(item_id, "Failed to save blog post")
+                    continue
+
+                if item['agent_type'] == BLOG_ARTIST_AI_AGENT:
+                    await generate_blog_image(
+                        item.get('image_prompt'),
+                        item.get('webhook_url'),
+                        filename,
+                        item.get('chaos_percentage') or MIDJOURNEY_CHAOS_PERCENTAGE
+                    )
+
+                get_artifact_store().save(filename, filepath=str(filepath))
+                post.update({'filename': filename, 'filepath': filepath})
+                self._advance(post, 'done')
+            except Exception as e:
+                self._fail(item_id, str(e))
+            finally:
+                self._save_state()
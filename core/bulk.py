@@ -0,0 +1,205 @@
+"""Headless bulk generation.
+
+Runs BlogAgent.create for every item in a JSONL or CSV file on one event
+loop, with a fixed number of concurrent workers. The workers share the
+HTTP session pool, the loop's AsyncAnthropic client and the rate limiters;
+each item still gets its own BlogAgent with its own AnthropicService and
+BraveSearchClient wrappers, which are closed when the item finishes:
+
+    python -m blogi.core.bulk topics.jsonl --workers 4
+
+Each item is an object/row with 'agent_name' (or --agent-name) and a 'topic'
+or 'image_prompt'; 'agent_type' is inferred from the agent name, and
+'webhook_url' is required for artist items. An optional 'id' names the item
+in the manifest, otherwise one is derived from its content.
+
+Every finished item is appended to a JSONL manifest; an item whose draft or
+save failed is recorded as a failure. Rerunning with the same manifest skips
+items that already succeeded, so an interrupted run resumes.
+"""
+import sys
+import csv
+import math
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from blogi.core.config import (
+    logger,
+    BLOG_AGENT_NAMES,
+    BULK_WORKERS,
+    MIDJOURNEY_CHAOS_PERCENTAGE
+)
+from blogi.core.agent import BlogAgent
+
+ITEM_FIELDS = ('agent_type', 'agent_name', 'topic', 'image_prompt', 'webhook_url', 'chaos_percentage')
+
+def load_items(path: Path, agent_name: Optional[str] = None, webhook_url: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Read items from a .jsonl or .csv file, filling in defaults and ids."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.suffix.lower() == '.csv':
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    items = []
+    for row in rows:
+        item = {field: (row.get(field) or None) for field in ITEM_FIELDS}
+        item['agent_name'] = item['agent_name'] or agent_name
+        item['webhook_url'] = item['webhook_url'] or webhook_url
+        if not item['agent_type']:
+            item['agent_type'] = next(
+                (agent_type for agent_type, names in BLOG_AGENT_NAMES.items() if item['agent_name'] in names),
+                None
+            )
+        item['id'] = str(row.get('id') or hashlib.sha1(
+            json.dumps([item[field] for field in ITEM_FIELDS]).encode('utf-8')
+        ).hexdigest()[:12])
+        items.append(item)
+    return items
+
+def completed_ids(manifest_path: Path) -> Set[str]:
+    """Ids of items that already succeeded according to the manifest."""
+    if not manifest_path.exists():
+        return set()
+    done = set()
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write can leave a partial last line
+                continue
+            if record.get('success'):
+                done.add(record['id'])
+    return done
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+class BulkRunner:
+    """Feeds items to a pool of worker tasks and records each result in the manifest."""
+
+    def __init__(self, items: List[Dict[str, Any]], manifest_path: Path, workers: int = BULK_WORKERS):
+        self.items = items
+        self.manifest_path = Path(manifest_path)
+        self.workers = workers
+        self.records: List[Dict[str, Any]] = []
+
+    async def run(self) -> Dict[str, Any]:
+        done = completed_ids(self.manifest_path)
+        pending = [item for item in self.items if item['id'] not in done]
+        logger.info(
+            f"Bulk run: {len(self.items)} items, {len(self.items) - len(pending)} already done, "
+            f"{len(pending)} to generate with {self.workers} workers"
+        )
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in pending:
+            queue.put_nowait(item)
+
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        started = time.monotonic()
+        with open(self.manifest_path, 'a', encoding='utf-8') as manifest:
+            workers = [
+                asyncio.create_task(self._worker(queue, manifest))
+                for _ in range(min(self.workers, len(pending)))
+            ]
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                for worker in workers:
+                    worker.cancel()
+        return self.summary(time.monotonic() - started)
+
+    async def _worker(self, queue: asyncio.Queue, manifest):
+        while True:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            started_at = datetime.now().isoformat()
+            started = time.monotonic()
+            try:
+                success, message, filepath, filename = await BlogAgent.create(
+                    agent_type=item['agent_type'],
+                    agent_name=item['agent_name'],
+                    topic=item['topic'],
+                    image_prompt=item['image_prompt'],
+                    webhook_url=item['webhook_url'],
+                    chaos_percentage=item['chaos_percentage'] or MIDJOURNEY_CHAOS_PERCENTAGE,
+                    job_id=item['id']
+                )
+            except Exception as e:
+                success, message, filepath, filename = False, str(e), None, None
+
+            record = {
+                'id': item['id'],
+                'success': success,
+                'message': message,
+                'filepath': filepath,
+                'filename': filename,
+                'latency': round(time.monotonic() - started, 3),
+                'started_at': started_at,
+                'finished_at': datetime.now().isoformat()
+            }
+            self.records.append(record)
+            manifest.write(json.dumps(record, ensure_ascii=False) + "\n")
+            manifest.flush()
+            logger.info(f"Bulk item {item['id']} {'succeeded' if success else 'failed'} in {record['latency']:.1f}s")
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        latencies = [record['latency'] for record in self.records]
+        succeeded = sum(1 for record in self.records if record['success'])
+        return {
+            'processed': len(self.records),
+            'succeeded': succeeded,
+            'failed': len(self.records) - succeeded,
+            'elapsed': round(elapsed, 1),
+            'posts_per_minute': round(succeeded / elapsed * 60, 2) if elapsed else 0.0,
+            'p50_latency': round(percentile(latencies, 50), 1),
+            'p95_latency': round(percentile(latencies, 95), 1)
+        }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Generate blog posts in bulk from a JSONL or CSV file')
+    parser.add_argument('input', type=Path,
+                       help='JSONL or CSV file of topics / image prompts')
+    parser.add_argument('--workers', type=int, default=BULK_WORKERS,
+                       help=f'Concurrent generations (default: {BULK_WORKERS})')
+    parser.add_argument('--manifest', type=Path, default=None,
+                       help='Result manifest, also used to resume (default: <input>.manifest.jsonl)')
+    parser.add_argument('--agent-name', default=None,
+                       help='Agent name for items that do not set one')
+    parser.add_argument('--webhook-url', default=None,
+                       help='Webhook URL for artist items that do not set one')
+    args = parser.parse_args(argv)
+
+    items = load_items(args.input, args.agent_name, args.webhook_url)
+    invalid = [item['id'] for item in items if not item['agent_type']]
+    if invalid:
+        parser.error(f"Items without a known agent_name: {', '.join(invalid)}")
+
+    manifest_path = args.manifest or args.input.with_suffix('.manifest.jsonl')
+    summary = asyncio.run(BulkRunner(items, manifest_path, args.workers).run())
+
+    logger.info(
+        f"Bulk run finished: {summary['succeeded']}/{summary['processed']} succeeded in {summary['elapsed']}s, "
+        f"{summary['posts_per_minute']} posts/min, p50 {summary['p50_latency']}s, p95 {summary['p95_latency']}s"
+    )
+    print(json.dumps(summary, indent=2))
+    return 0 if summary['failed'] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -36,6 +36,20 @@ BLOG_SITE_STATIC_IMAGES_PATH = BLOG_SITE_PATH / "static" / "images"
 BLOG_SITE_STATIC_AI_IMAGES_PATH = BLOG_SITE_PATH / "static" / "images" / "ai_images"
 BLOG_SITE_POSTS_PATH = BLOG_SITE_PATH / "content" / "posts"
 PROMPTS_DIR = PROJECT_ROOT / "blogi" / "prompts"
+# Prompt files are cached in memory (see core/templates.py); a background thread
+# checks their mtimes every TEMPLATE_REFRESH_INTERVAL seconds (0 disables it)
+TEMPLATE_SUFFIXES = ('.txt', '.md')
+TEMPLATE_REFRESH_INTERVAL = 2
+
+# Local caches (LLM responses, fetched pages, search results) share one SQLite file
+CACHE_DIR = BLOGI_ROOT / "tmp" / "cache"
+CACHE_DB_PATH = CACHE_DIR / "cache.db"
+# Expired and over-limit entries are trimmed once every CACHE_EVICT_INTERVAL
+# writes per cache rather than on every write
+CACHE_EVICT_INTERVAL = 100
+
+# Per-post generation artifacts (draft, metadata, paths; see utils/artifacts.py)
+ARTIFACT_DB_PATH = BLOGI_ROOT / "tmp" / "artifacts.db"
 
 OBSIDIAN_AI_POSTS_PATH = OBSIDIAN_NOTES_PATH / "ai_posts"
 OBSIDIAN_AI_IMAGES = OBSIDIAN_NOTES_PATH / "images" / "ai_images"
@@ -57,14 +71,166 @@ BLOG_ARTIST_RANDOM_PROMPT_ARTIST = "random_prompt_artist"
 CLAUDE_MODEL = "claude-3-haiku-20240307"
 OPENAI_MODEL = "gpt-4o-mini"
 
+# Metadata generation: "fused" asks for title, tags and filename in a single
+# JSON completion, "separate" sends the three prompts concurrently
+METADATA_MODE = "fused"
+
+# Opt-in on-disk cache for Anthropic responses (set LLM_CACHE_ENABLED=true)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_CACHE_TTL = 7 * 24 * 60 * 60  # seconds
+LLM_CACHE_MAX_ENTRIES = 5000
+LLM_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
 MIDJOURNEY_ASPECT_RATIO = "7:4"
-MIDJOURNEY_CHAOS_PERCENTAGE = "0"  # Default value, will be overridden by UI
+MIDJOURNEY_CHAOS_PERCENTAGE = "0"  # Default value, each job can pass its own
     
 USERAPI_AI_API_BASE_URL = "https://api.userapi.ai/midjourney/v2"   
 
+# Midjourney submissions to userapi.ai: per-request timeout, retries with
+# jittered exponential backoff, and how many submissions one account may have
+# in flight at once across the whole process
+MIDJOURNEY_SUBMIT_TIMEOUT = 30      # seconds
+MIDJOURNEY_MAX_RETRIES = 3
+MIDJOURNEY_BACKOFF_BASE = 2.0       # seconds
+MIDJOURNEY_BACKOFF_MAX = 30.0       # seconds
+MIDJOURNEY_MAX_CONCURRENT_PER_ACCOUNT = int(os.getenv("MIDJOURNEY_MAX_CONCURRENT_PER_ACCOUNT", "2"))
+
+# Shared HTTP connection pool (see core/web_service.py)
+HTTP_POOL_LIMIT = 100           # total open connections
+HTTP_POOL_LIMIT_PER_HOST = 10   # open connections per host
+HTTP_DNS_CACHE_TTL = 300        # seconds
+HTTP_KEEPALIVE_TIMEOUT = 30     # seconds an idle connection is kept open
+HTTP_REQUEST_TIMEOUT = 30       # seconds
+
+# On-disk cache of extracted research pages. Within HTTP_CACHE_FRESH_FOR a page
+# is served from disk without contacting the site; after that it is
+# revalidated with If-None-Match/If-Modified-Since and kept on a 304.
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+HTTP_CACHE_FRESH_FOR = 60 * 60              # seconds
+HTTP_CACHE_TTL = 30 * 24 * 60 * 60          # seconds before an entry is dropped entirely
+HTTP_CACHE_MAX_ENTRIES = 2000
+HTTP_CACHE_MAX_BYTES = 100 * 1024 * 1024
+
+# Research page text extraction (see core/extraction.py): "streaming" parses the
+# body as it arrives and stops early, "soup" builds a full BeautifulSoup tree
+HTML_EXTRACTOR = "streaming"
+HTML_MAX_BYTES = 2 * 1024 * 1024   # hard cap on bytes read from a page
+HTML_MAX_CHARS = 10000             # characters of text kept per page
+HTML_CHUNK_SIZE = 64 * 1024
+
 BRAVE_SEARCH_TIMEOUT = 30
 MAX_SEARCH_RESULTS = 3
 
+# Brave search results are cached on disk, keyed by normalized query and params
+BRAVE_CACHE_ENABLED = os.getenv("BRAVE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+BRAVE_CACHE_TTL = 24 * 60 * 60  # seconds
+BRAVE_CACHE_MAX_ENTRIES = 1000
+
+# Research fan-out: how many sources are fetched/summarized at once, and how
+# long (in seconds) a single source may take before it is dropped
+RESEARCH_CONCURRENCY = 3
+RESEARCH_SOURCE_TIMEOUT = 60
+
+# Outbound rate limits (see utils/rate_limit.py). rate is requests per second,
+# burst the number of requests that may be sent back-to-back, and
+# max_in_flight the number of concurrent requests. Hosts without an entry
+# each get their own limiter with the "default" limits.
+RATE_LIMITS = {
+    'anthropic': {'rate': 0.8, 'burst': 5, 'max_in_flight': 5},
+    'brave': {'rate': 1.0, 'burst': 1, 'max_in_flight': 1},
+    'userapi': {'rate': 0.5, 'burst': 2, 'max_in_flight': 2},
+    'elevenlabs': {'rate': 1.0, 'burst': 2, 'max_in_flight': 2},
+    'default': {'rate': 2.0, 'burst': 4, 'max_in_flight': 4}
+}
+RATE_LIMIT_HOSTS = {
+    'api.anthropic.com': 'anthropic',
+    'api.search.brave.com': 'brave',
+    'api.userapi.ai': 'userapi',
+    'api.elevenlabs.io': 'elevenlabs'
+}
+# Minimum seconds between two concurrency reductions of the same limiter
+RATE_LIMIT_BACKOFF_WINDOW = 5
+
+# Anthropic retries: jittered exponential backoff unless the API says how long to wait
+ANTHROPIC_MAX_RETRIES = 5
+ANTHROPIC_BACKOFF_BASE = 1.0    # seconds
+ANTHROPIC_BACKOFF_MAX = 60.0    # seconds
+
+# Bulk generation through the Message Batches API (see core/batch.py). Set
+# ANTHROPIC_BATCH_BASE_URL to point the batch client at a local stub
+# (utils/batch_api_stub.py); unset uses the regular API endpoint.
+BATCH_POLL_INTERVAL = 60        # seconds between batch status checks
+BATCH_API_BASE_URL = os.getenv("ANTHROPIC_BATCH_BASE_URL", None)
+BATCH_STATE_DIR = BLOGI_ROOT / "tmp" / "batches"
+
+# What the last deploy synced (content hashes and file stats, see core/deployment.py),
+# so unchanged posts are skipped
+DEPLOY_MANIFEST_PATH = BLOGI_ROOT / "tmp" / "deploy_manifest.json"
+
+# Image sync transfers (see utils/transfer.py): parallel copies, trying each
+# method in order. "hardlink" can be put first to avoid copying at all, but the
+# site's image then shares the vault file, so editing either one in place
+# changes both (see DeploymentManager.sync_images).
+DEPLOY_TRANSFER_WORKERS = 8
+DEPLOY_TRANSFER_METHODS = tuple(
+    os.getenv("DEPLOY_TRANSFER_METHODS", "copy_file_range,copy").split(",")
+)
+
+# Concurrent generations for the headless bulk runner (python -m blogi.core.bulk)
+BULK_WORKERS = 4
+
+# Admin /generate job queue (see core/jobs.py): concurrent generations, and how
+# many finished jobs are kept for the status/result endpoints
+JOB_WORKERS = 2
+JOB_HISTORY_LIMIT = 200
+
+# Seconds of silence after which the admin job event stream sends a keep-alive
+SSE_KEEPALIVE_INTERVAL = 15
+
+# Midjourney webhook server (utils/midjourney_webhook_server.py): finished images
+# are downloaded and sliced by background workers after the webhook is acknowledged.
+# When the queue is full new webhooks get a 503 so the provider retries later;
+# on shutdown queued work gets up to WEBHOOK_DRAIN_TIMEOUT seconds to finish.
+WEBHOOK_WORKERS = 2
+WEBHOOK_QUEUE_MAX = 100
+WEBHOOK_DRAIN_TIMEOUT = 60
+
+# Webhook idempotency records (SQLite, shared by every webhook server process
+# using the same BLOGI_ROOT). A claim is renewed when a worker starts on the
+# image and expires WEBHOOK_CLAIM_TIMEOUT seconds later unless processing
+# finishes, so work from a crashed worker is retried; finished images are
+# remembered for WEBHOOK_IDEMPOTENCY_TTL seconds (up to the newest
+# WEBHOOK_IDEMPOTENCY_MAX_ENTRIES; active claims are never trimmed).
+WEBHOOK_IDEMPOTENCY_DB_PATH = CACHE_DIR / "webhooks.db"
+WEBHOOK_CLAIM_TIMEOUT = 10 * 60
+WEBHOOK_IDEMPOTENCY_TTL = 30 * 24 * 60 * 60
+WEBHOOK_IDEMPOTENCY_MAX_ENTRIES = 50000
+
+# Grid image downloads: streamed to a .part file in chunks, resumed with an HTTP
+# Range request on retry, and abandoned past WEBHOOK_DOWNLOAD_MAX_BYTES
+WEBHOOK_DOWNLOAD_CONNECT_TIMEOUT = 10   # seconds
+WEBHOOK_DOWNLOAD_READ_TIMEOUT = 60      # seconds between received bytes
+WEBHOOK_DOWNLOAD_RETRIES = 3
+WEBHOOK_DOWNLOAD_MAX_BYTES = 50 * 1024 * 1024
+WEBHOOK_DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# Grid slicing (see utils/image_slicing.py): each quadrant's outputs are
+# encoded by one task on a pool of IMAGE_SLICE_WORKERS processes (1 encodes inline).
+# Thumbnails are IMAGE_THUMBNAIL_PERCENT of a quadrant, box-reduced to within
+# IMAGE_THUMBNAIL_REDUCING_GAP times the target size before the LANCZOS pass.
+IMAGE_SLICE_WORKERS = int(os.getenv("IMAGE_SLICE_WORKERS", str(min(8, os.cpu_count() or 1))))
+IMAGE_THUMBNAIL_PERCENT = 15
+IMAGE_THUMBNAIL_REDUCING_GAP = 2.0
+
+# Responsive variants of each quadrant for the gallery shortcode's srcset,
+# listed with their sizes in <grid>.variants.json next to the images. Widths
+# wider than the quadrant are skipped; formats Pillow cannot encode are skipped.
+IMAGE_VARIANT_WIDTHS = (480, 768, 1024)
+IMAGE_VARIANT_FORMATS = {
+    'avif': {'quality': 50},
+    'webp': {'quality': 80, 'method': 4}
+}
+
 # Debug mode flag - set to True to enable DEBUG logging
 DEBUG_MODE = False
 
@@ -91,31 +257,3 @@ def setup_logging():
 
 # Create logger instance
 logger = setup_logging()
-
-class FilenameManager:
-    def __init__(self):
-        self._filename = "0000000000"
-    
-    @property
-    def filename(self):
-        return self._filename
-    
-    def update(self, new_filename: str):
-        self._filename = new_filename
-        logger.info(f"Updated IMAGE_FILENAME to: {self._filename}")
-
-class ChaosPercentageManager:
-    def __init__(self):
-        self._chaos_percentage = "0"
-    
-    @property
-    def chaos_percentage(self):
-        return self._chaos_percentage
-    
-    def update(self, new_percentage: str):
-        self._chaos_percentage = new_percentage
-        logger.info(f"Updated MIDJOURNEY_CHAOS_PERCENTAGE to: {self._chaos_percentage}")
-
-# Create instances
-filename_manager = FilenameManager()
-chaos_percentage_manager = ChaosPercentageManager()
\ No newline at end of file
@@ -1,12 +1,13 @@
 import os
 import sys
 import re
+import json
+import hashlib
 import subprocess
 import logging
 import datetime
-import shutil
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 # Add the parent directory of the project root to Python path
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -22,8 +23,10 @@ from blogi.core.config import (
     BLOG_SITE_POSTS_PATH,
     OBSIDIAN_POSTS_PATH,
     BLOG_SITE_STATIC_AI_IMAGES_PATH,
-    OBSIDIAN_AI_IMAGES
+    OBSIDIAN_AI_IMAGES,
+    DEPLOY_MANIFEST_PATH
 )
+from blogi.utils.transfer import TransferEngine
 
 # Debug mode flag - set to True to enable DEBUG logging
 DEBUG_MODE = False
@@ -40,6 +43,74 @@ def setup_logging():
 
 logger = setup_logging()
 
+def file_signature(path: Path) -> List[int]:
+    """Cheap change check for a file: [mtime in ns, size]."""
+    stat = path.stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+class DeployManifest:
+    """What previous deploys synced, persisted as JSON between runs.
+
+    Each sync step keeps its own section, keyed by filename. A missing or
+    unreadable manifest just means everything is checked again.
+    """
+
+    def __init__(self, path: Path = DEPLOY_MANIFEST_PATH):
+        self.path = Path(path)
+        self.data: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable deploy manifest {self.path}: {e}")
+            return {}
+
+    def section(self, name: str) -> Dict[str, Any]:
+        return self.data.setdefault(name, {})
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+class ImageReferenceIndex:
+    """Which /images/ files each post references, kept in a deploy manifest section.
+
+    Posts are re-parsed only when their mtime or size changes, and `copied`
+    records the source signature of every image last copied to the site, so
+    an image whose signature differs has been replaced and is copied again.
+    """
+
+    def __init__(self, section: Dict[str, Any]):
+        self.posts: Dict[str, Dict[str, Any]] = section.setdefault('posts', {})
+        self.copied: Dict[str, List[int]] = section.setdefault('copied', {})
+
+    def is_current(self, post: str, signature: List[int]) -> bool:
+        entry = self.posts.get(post)
+        return entry is not None and entry['signature'] == signature
+
+    def update(self, post: str, signature: List[int], images: List[str], unconverted: int):
+        self.posts[post] = {'signature': signature, 'images': sorted(set(images)), 'unconverted': unconverted}
+
+    def remove(self, post: str):
+        self.posts.pop(post, None)
+
+    def referenced(self) -> Set[str]:
+        return {image for entry in self.posts.values() for image in entry['images']}
+
+    def is_copied(self, image: str, signature: List[int]) -> bool:
+        """Whether the site has the image as it was when it had this source signature."""
+        return self.copied.get(image) == signature
+
 class DeploymentManager:
     def __init__(self):
         self.logger = logger
@@ -53,6 +124,8 @@ class DeploymentManager:
         self.images_dest = BLOG_SITE_STATIC_IMAGES_PATH
         self.ai_images_source = OBSIDIAN_AI_IMAGES
         self.ai_images_dest = BLOG_SITE_STATIC_AI_IMAGES_PATH
+        self.manifest = DeployManifest()
+        self.transfers = TransferEngine()
 
     def run_command(self, command: list[str], cwd: str = None) -> Tuple[bool, str]:
         """Run a shell command and return success status and output."""
@@ -68,8 +141,22 @@ class DeploymentManager:
         except subprocess.CalledProcessError as e:
             return False, e.stderr
 
-    def sync_images(self) -> bool:
-        """Verify and sync all images from Obsidian to website folder, including AI images."""
+    def sync_images(self, full: bool = False) -> bool:
+        """Verify and sync all images from Obsidian to website folder, including AI images.
+
+        Only posts changed since the last deploy are re-parsed. Each referenced
+        image is stat'ed and compared with the source signature recorded when
+        it was last copied, so new and replaced images are copied and the rest
+        are skipped without touching the destination. With full=True the
+        destination of every referenced image is checked as well, e.g. after
+        files were removed from the site by hand.
+
+        Files are transferred with DEPLOY_TRANSFER_METHODS. When "hardlink" is
+        enabled and both folders are on one filesystem, the site's image and
+        the vault's are the same file: an in-place edit to either one silently
+        changes the other. Replacing the vault file with a new one (e.g. by
+        renaming over it) breaks the link, and the next sync copies it again.
+        """
         try:
             self.logger.info("Verifying and syncing images:")
             self.logger.info(f"  Source: {self.images_source}")
@@ -85,40 +172,76 @@ class DeploymentManager:
             # Create destination directory if it doesn't exist
             self.images_dest.mkdir(parents=True, exist_ok=True)
 
-            # Verify markdown files for standard images
-            md_files = list(self.dest_path.glob('*.md'))
-            self.logger.info(f"Verifying {len(md_files)} markdown files:")
+            # Re-parse markdown files that changed since the last deploy
+            index = ImageReferenceIndex(self.manifest.section('images'))
+            md_files = {f.name: f for f in self.dest_path.glob('*.md')}
+            for post in set(index.posts) - set(md_files):
+                index.remove(post)
 
-            for filepath in md_files:
-                self.logger.info(f"  File: {filepath.name}")
+            changed_posts = []
+            for name, filepath in sorted(md_files.items()):
+                signature = file_signature(filepath)
+                if index.is_current(name, signature):
+                    continue
+                self.logger.info(f"  File: {name}")
                 with open(filepath, "r") as file:
                     content = file.read()
                 
                 # Check for unconverted links
                 obsidian_links = re.findall(r'\[\[([^]]*\.png)\]\]', content)
-                if obsidian_links:
-                    self.logger.warning(f"    Found {len(obsidian_links)} unconverted image links!")
-                
-                # Verify and copy markdown images
                 markdown_links = re.findall(r'!\[.*?\]\(/images/([^)]+)\)', content)
-                if markdown_links:
-                    self.logger.info(f"    Found {len(markdown_links)} image references:")
-                    for image in markdown_links:
-                        source_path = self.images_source / image
-                        dest_path = self.images_dest / image
-                        
-                        # Check if source image exists
-                        if source_path.exists():
-                            # Copy image if it doesn't exist in destination or if source is newer
-                            if not dest_path.exists() or (source_path.stat().st_mtime > dest_path.stat().st_mtime):
-                                self.logger.info(f"      Copying: {image}")
-                                shutil.copy2(source_path, dest_path)
-                                self.changes_made = True
-                            self.logger.info(f"      ✓ {dest_path}")
-                        else:
-                            self.logger.warning(f"      ✗ Source image missing: {source_path}")
+                index.update(name, signature, markdown_links, len(obsidian_links))
+                changed_posts.append(name)
+                self.logger.info(f"    Found {len(markdown_links)} image references")
+
+            for name, entry in index.posts.items():
+                if entry['unconverted']:
+                    self.logger.warning(f"  {name}: found {entry['unconverted']} unconverted image links!")
+
+            # Verify and copy markdown images
+            images = index.referenced()
+            self.logger.info(
+                f"Checking {len(images)} images ({len(changed_posts)} of {len(md_files)} markdown files changed)"
+            )
+            to_copy = []
+            unchanged = 0
+            for image in sorted(images):
+                source_path = self.images_source / image
+                dest_path = self.images_dest / image
+                
+                # Check if source image exists
+                try:
+                    signature = file_signature(source_path)
+                except FileNotFoundError:
+                    index.copied.pop(image, None)
+                    posts = ', '.join(sorted(post for post, entry in index.posts.items() if image in entry['images']))
+                    self.logger.warning(f"      ✗ Source image missing: {source_path} (referenced by {posts})")
+                    continue
+
+                # Unchanged since it was last copied
+                if index.is_copied(image, signature) and not full:
+                    unchanged += 1
+                    continue
+
+                # Copy image if it doesn't exist in destination, was replaced since the last copy, or source is newer
+                replaced = image in index.copied and not index.is_copied(image, signature)
+                if not dest_path.exists() or replaced or (source_path.stat().st_mtime > dest_path.stat().st_mtime):
+                    self.logger.info(f"      Copying: {image}")
+                    to_copy.append((source_path, dest_path))
                 else:
-                    self.logger.info("    No images found")
+                    index.copied[image] = signature
+                    self.logger.info(f"      ✓ {dest_path}")
+            self.logger.info(f"    {unchanged} images unchanged since the last deploy")
+
+            for source_path, dest_path in self.transfers.transfer_all(to_copy):
+                image = dest_path.relative_to(self.images_dest).as_posix()
+                index.copied[image] = file_signature(source_path)
+                self.changes_made = True
+                self.logger.info(f"      ✓ {dest_path}")
+
+            for image in set(index.copied) - index.referenced():
+                del index.copied[image]
+            self.manifest.save()
 
             # --- New Section: Sync AI Images ---
             self.logger.info("Verifying and syncing AI images:")
@@ -136,13 +259,17 @@ class DeploymentManager:
             self.ai_images_dest.mkdir(parents=True, exist_ok=True)
 
             # Copy new or updated AI images
+            to_copy = []
             for source_file in self.ai_images_source.glob('*'):
+                if source_file.suffix == '.part':
+                    # Still being downloaded by the webhook server
+                    continue
                 dest_file = self.ai_images_dest / source_file.name
                 if not dest_file.exists() or (source_file.stat().st_mtime > dest_file.stat().st_mtime):
                     self.logger.info(f"      Copying AI image: {source_file.name}")
-                    shutil.copy2(source_file, dest_file)
-                    self.changes_made = True
-                self.logger.info(f"      ✓ {dest_file}")
+                    to_copy.append((source_file, dest_file))
+            if self.transfers.transfer_all(to_copy):
+                self.changes_made = True
 
             # Delete AI images in destination that no longer exist in source
             for dest_file in self.ai_images_dest.glob('*'):
@@ -152,6 +279,7 @@ class DeploymentManager:
                     dest_file.unlink()
                     self.changes_made = True
 
+            self.logger.info(f"Image transfers: {self.transfers.summary()}")
             return True
             
         except Exception as e:
@@ -160,46 +288,80 @@ class DeploymentManager:
             return False
 
     def sync_content(self) -> bool:
-        """Sync content from Obsidian to Hugo."""
+        """Sync content from Obsidian to Hugo.
+
+        Posts whose source and destination files are unchanged since the last
+        deploy (same mtime and size as in the manifest) are skipped without
+        being read; the rest are converted and written only where the result
+        differs from what is on disk.
+        """
         try:
             self.dest_path.mkdir(parents=True, exist_ok=True)
+            synced = self.manifest.section('content')
             
             # Get lists of files in both directories
-            source_files = set(f.name for f in self.origin_path.glob('*.md'))
+            source_files = {f.name: f for f in self.origin_path.glob('*.md')}
             dest_files = set(f.name for f in self.dest_path.glob('*.md'))
             
             # Find files to remove (in dest but not in source)
-            files_to_remove = dest_files - source_files
+            files_to_remove = dest_files - set(source_files)
             for filename in files_to_remove:
                 file_to_remove = self.dest_path / filename
                 self.logger.info(f"Removing file: {filename}")
                 file_to_remove.unlink()
                 self.changes_made = True
+            for filename in set(synced) - set(source_files):
+                del synced[filename]
             
             # Process source files
-            files_processed = 0
-            for source_file in self.origin_path.glob('*.md'):
-                self.logger.info(f"Checking file: {source_file.name}")
-                
-                dest_file = self.dest_path / source_file.name
+            files_updated = 0
+            files_unchanged = 0
+            for filename, source_file in sorted(source_files.items()):
+                dest_file = self.dest_path / filename
+                entry = synced.get(filename)
+                if (entry and dest_file.exists()
+                        and entry['source'] == file_signature(source_file)
+                        and entry['dest'] == file_signature(dest_file)):
+                    files_unchanged += 1
+                    continue
 
+                self.logger.info(f"Checking file: {filename}")
                 with open(source_file, "r") as file:
-                    content = file.read()
-                
-                content = self._process_image_paths_in_content(content, source_file)
+                    original = file.read()
                 
-                with open(source_file, "w") as file:
-                    file.write(content)
-                with open(dest_file, "w") as file:
-                    file.write(content)
+                content = self._process_image_paths_in_content(original, source_file)
+                digest = content_hash(content)
                 
-                files_processed += 1
-                
-            if files_processed > 0 or files_to_remove:
+                if content != original:
+                    with open(source_file, "w") as file:
+                        file.write(content)
+
+                dest_unchanged = dest_file.exists() and (
+                    (entry and entry['sha256'] == digest and entry['dest'] == file_signature(dest_file))
+                    or dest_file.read_text() == content
+                )
+                if dest_unchanged:
+                    files_unchanged += 1
+                else:
+                    with open(dest_file, "w") as file:
+                        file.write(content)
+                    files_updated += 1
+
+                synced[filename] = {
+                    'sha256': digest,
+                    'source': file_signature(source_file),
+                    'dest': file_signature(dest_file)
+                }
+            
+            self.manifest.save()
+            if files_updated > 0 or files_to_remove:
                 self.changes_made = True
-                self.logger.info(f"Content sync completed successfully ({files_processed} files updated, {len(files_to_remove)} files removed)")
+                self.logger.info(
+                    f"Content sync completed successfully ({files_updated} files updated, "
+                    f"{len(files_to_remove)} files removed, {files_unchanged} unchanged)"
+                )
             else:
-                self.logger.info("No files needed updating")
+                self.logger.info(f"No files needed updating ({files_unchanged} unchanged)")
             return True
             
         except Exception as e:
@@ -0,0 +1,165 @@
+import re
+from abc import ABC, abstractmethod
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from bs4 import BeautifulSoup
+
+from blogi.core.config import HTML_EXTRACTOR, HTML_MAX_CHARS
+
+# Elements whose text never counts as page content
+SKIPPED_TAGS = {"script", "style", "nav", "header", "footer", "noscript", "template", "svg"}
+
+# Main-content regions in order of preference
+MAIN_CONTENT_CLASS = re.compile(r'content|article|post')
+REGION_PRIORITY = ['main', 'article', 'div']
+
+class ContentExtractor(ABC):
+    """Incrementally fed extractor that turns HTML into main-content text.
+
+    Call feed() with decoded chunks until it returns True (enough text has been
+    collected) or the input ends, then call result().
+    """
+
+    def __init__(self, max_chars: int = HTML_MAX_CHARS):
+        self.max_chars = max_chars
+
+    @abstractmethod
+    def feed(self, chunk: str) -> bool:
+        ...
+
+    @abstractmethod
+    def result(self) -> str:
+        ...
+
+    def extract(self, html: str) -> str:
+        """Extract text from a complete document."""
+        self.feed(html)
+        return self.result()
+
+class SoupExtractor(ContentExtractor):
+    """Builds a full BeautifulSoup tree once the whole document has been read."""
+
+    def __init__(self, max_chars: int = HTML_MAX_CHARS):
+        super().__init__(max_chars)
+        self._chunks: List[str] = []
+
+    def feed(self, chunk: str) -> bool:
+        self._chunks.append(chunk)
+        return False
+
+    def result(self) -> str:
+        soup = BeautifulSoup("".join(self._chunks), 'html.parser')
+
+        # Clean up the HTML
+        for element in soup(["script", "style", "nav", "header", "footer"]):
+            element.decompose()
+
+        # Extract main content
+        main_content = (
+            soup.find('main') or
+            soup.find('article') or
+            soup.find('div', class_=MAIN_CONTENT_CLASS)
+        )
+
+        text = (main_content or soup).get_text(separator=' ', strip=True)
+        return re.sub(r'\s+', ' ', text)[:self.max_chars]
+
+class StreamingExtractor(ContentExtractor, HTMLParser):
+    """Event-driven extractor that never builds a document tree.
+
+    Text is collected for the first <main>, <article> and content-like <div>
+    as well as for the page as a whole; parsing stops as soon as any
+    main-content region holds max_chars of text.
+    """
+
+    def __init__(self, max_chars: int = HTML_MAX_CHARS):
+        ContentExtractor.__init__(self, max_chars)
+        HTMLParser.__init__(self, convert_charrefs=True)
+        self._skip_depth: Dict[str, int] = {}
+        # Per region kind: [tag, open depth, collected parts, collected chars, closed]
+        self._regions: Dict[str, list] = {}
+        self._page_parts: List[str] = []
+        self._page_chars = 0
+        self._done = False
+
+    def feed(self, chunk: str) -> bool:
+        if not self._done:
+            HTMLParser.feed(self, chunk)
+        return self._done
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth[tag] = self._skip_depth.get(tag, 0) + 1
+            return
+
+        for region in self._regions.values():
+            if not region[4] and region[0] == tag:
+                region[1] += 1
+
+        kind = self._region_kind(tag, attrs)
+        if kind and kind not in self._regions:
+            self._regions[kind] = [tag, 1, [], 0, False]
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            if self._skip_depth.get(tag):
+                self._skip_depth[tag] -= 1
+            return
+
+        for region in self._regions.values():
+            if not region[4] and region[0] == tag:
+                region[1] -= 1
+                if region[1] <= 0:
+                    region[4] = True
+
+    def handle_data(self, data):
+        if self._done or any(self._skip_depth.values()):
+            return
+        text = data.strip()
+        if not text:
+            return
+
+        if self._page_chars < self.max_chars:
+            self._page_parts.append(text)
+            self._page_chars += len(text) + 1
+
+        for region in self._regions.values():
+            if not region[4]:
+                region[2].append(text)
+                region[3] += len(text) + 1
+                if region[3] >= self.max_chars:
+                    self._done = True
+
+    def result(self) -> str:
+        if not self._done:
+            self.close()
+
+        parts = self._page_parts
+        for kind in REGION_PRIORITY:
+            region = self._regions.get(kind)
+            if region and region[2]:
+                parts = region[2]
+                break
+        return re.sub(r'\s+', ' ', " ".join(parts)).strip()[:self.max_chars]
+
+    @staticmethod
+    def _region_kind(tag: str, attrs) -> Optional[str]:
+        if tag in ('main', 'article'):
+            return tag
+        if tag == 'div':
+            classes = dict(attrs).get('class') or ''
+            if MAIN_CONTENT_CLASS.search(classes):
+                return 'div'
+        return None
+
+EXTRACTORS = {
+    'soup': SoupExtractor,
+    'streaming': StreamingExtractor
+}
+
+def create_extractor(name: str = HTML_EXTRACTOR, max_chars: int = HTML_MAX_CHARS) -> ContentExtractor:
+    """Instantiate the configured extraction engine."""
+    try:
+        return EXTRACTORS[name](max_chars)
+    except KeyError:
+        raise ValueError(f"Unknown HTML extractor: {name}. Must be one of: {list(EXTRACTORS)}")
@@ -0,0 +1,231 @@
+import time
+import uuid
+import asyncio
+import threading
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from blogi.core.config import logger, JOB_WORKERS, JOB_HISTORY_LIMIT
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+FINISHED_STATES = (JOB_DONE, JOB_FAILED)
+
+# handler(job) -> result; the handler reads job.params and reports progress with job.emit(event, **data)
+JobHandler = Callable[['Job'], Awaitable[Dict[str, Any]]]
+
+# Placeholder left in the slots of token events merged away when a job finishes
+_MERGED = ('token', None)
+
+class Job:
+    """One submitted unit of work, its progress events and its result."""
+
+    def __init__(self, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.status = JOB_QUEUED
+        self.stage = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self.events: List[Tuple[str, Optional[Dict[str, Any]]]] = []
+        self.draft_chars = 0
+        # start index -> (end index, text offset of each merged token event)
+        self._merged_runs: Dict[int, Tuple[int, array]] = {}
+        self._changed = threading.Condition()
+
+    def emit(self, event: str, **data):
+        """Record a progress event and wake anyone waiting on this job.
+
+        The 'done' event also merges the job's token events, see _merge_tokens().
+        """
+        with self._changed:
+            if event == 'stage':
+                self.stage = data.get('stage')
+            elif event == 'token':
+                self.draft_chars += len(data.get('text', ''))
+            self.events.append((event, data))
+            if event == 'done':
+                self._merge_tokens()
+            self._changed.notify_all()
+
+    def _merge_tokens(self):
+        """Merge each run of token events into its first slot.
+
+        The other slots of the run keep a shared placeholder so event indices
+        stay valid for readers that are part-way through the stream.
+        """
+        # Caller holds self._changed
+        start = None
+        for index, (event, _) in enumerate(self.events + [('end', None)]):
+            if event == 'token':
+                if start is None:
+                    start = index
+                continue
+            if start is not None and index - start > 1:
+                texts = [data['text'] for _, data in self.events[start:index]]
+                offsets = array('L', [0])
+                for text in texts[:-1]:
+                    offsets.append(offsets[-1] + len(text))
+                self.events[start] = ('token', {'text': ''.join(texts)})
+                self.events[start + 1:index] = [_MERGED] * (index - start - 1)
+                self._merged_runs[start] = (index, offsets)
+            start = None
+
+    def wait_for_events(self, start: int, timeout: float) -> Tuple[List[Tuple[str, Dict[str, Any]]], int]:
+        """Return events from index start on, waiting up to timeout for new ones,
+        and the index to continue from."""
+        with self._changed:
+            if len(self.events) <= start:
+                self._changed.wait(timeout)
+            events = []
+            for run_start, (run_end, offsets) in self._merged_runs.items():
+                if run_start < start < run_end:
+                    # Resume inside a merged run with the text not sent yet
+                    text = self.events[run_start][1]['text'][offsets[start - run_start]:]
+                    events.append(('token', {'text': text}))
+                    start = run_end
+                    break
+            events.extend(event for event in self.events[start:] if event is not _MERGED)
+            return events, len(self.events)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'stage': self.stage,
+            'draft_chars': self.draft_chars,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error
+        }
+
+class JobQueue:
+    """Runs submitted jobs on a pool of worker tasks in a dedicated event-loop thread.
+
+    submit() is safe to call from any thread and returns immediately; the
+    loop thread is started on first use.
+    """
+
+    def __init__(self, handler: JobHandler, workers: int = JOB_WORKERS, history_limit: int = JOB_HISTORY_LIMIT):
+        self.handler = handler
+        self.workers = workers
+        self.history_limit = history_limit
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._started_at = None
+        # job id -> monotonic start time of jobs being worked on
+        self._running: Dict[str, float] = {}
+        self._busy_seconds = 0.0
+
+    def start(self):
+        with self._lock:
+            if not (self._thread and self._thread.is_alive()):
+                self._ready.clear()
+                self._thread = threading.Thread(target=self._run_loop, name='job-queue', daemon=True)
+                self._thread.start()
+                logger.info(f"Job queue started with {self.workers} workers")
+        self._ready.wait()
+
+    def stop(self):
+        """Cancel the workers and stop the loop thread; queued jobs are dropped."""
+        if self._loop and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        self._started_at = time.monotonic()
+        workers = [self._loop.create_task(self._worker()) for _ in range(self.workers)]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            self._loop.run_until_complete(asyncio.gather(*workers, return_exceptions=True))
+            self._loop.close()
+
+    def submit(self, params: Dict[str, Any]) -> Job:
+        self.start()
+        job = Job(params)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim_history()
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, job)
+        logger.info(f"Queued job {job.id}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _trim_history(self):
+        # Caller holds self._lock; only finished jobs are forgotten
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history_limit)]:
+            del self._jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            started = time.monotonic()
+            with self._lock:
+                self._running[job.id] = started
+            job.status = JOB_RUNNING
+            job.started_at = datetime.now().isoformat()
+            job.emit('stage', stage=JOB_RUNNING)
+            try:
+                job.result = await self.handler(job)
+                job.status = JOB_DONE if job.result.get('success', True) else JOB_FAILED
+                job.error = None if job.status == JOB_DONE else job.result.get('message')
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {str(e)}", exc_info=True)
+                job.status = JOB_FAILED
+                job.error = str(e)
+            finally:
+                job.finished_at = datetime.now().isoformat()
+                with self._lock:
+                    del self._running[job.id]
+                    self._busy_seconds += time.monotonic() - started
+                job.emit('done', status=job.status, **(job.result or {'success': False, 'message': job.error}))
+                self._queue.task_done()
+                logger.info(f"Job {job.id} {job.status} in {time.monotonic() - started:.1f}s")
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {state: 0 for state in (JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED)}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            now = time.monotonic()
+            uptime = now - self._started_at if self._started_at else 0.0
+            # Jobs still running count as busy up to now
+            busy_seconds = self._busy_seconds + sum(now - started for started in self._running.values())
+            return {
+                'workers': self.workers,
+                'busy_workers': len(self._running),
+                'queue_depth': counts[JOB_QUEUED],
+                'jobs': counts,
+                'utilization': round(busy_seconds / (uptime * self.workers), 3) if uptime else 0.0,
+                'uptime': round(uptime, 1)
+            }
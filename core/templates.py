@@ -0,0 +1,153 @@
+import os
+import time
+import string
+import threading
+from pathlib import Path
+from typing import Dict, FrozenSet, Optional, Union
+
+from blogi.core.config import logger, PROMPTS_DIR, TEMPLATE_SUFFIXES, TEMPLATE_REFRESH_INTERVAL
+
+class PromptTemplate(str):
+    """Prompt text with its str.format placeholders parsed up front.
+
+    Behaves like the plain string it wraps, so existing concatenation and
+    .format() calls keep working; format() reports missing placeholders by
+    template name instead of a bare KeyError.
+    """
+
+    def __new__(cls, text: str, name: str, mtime: float):
+        template = super().__new__(cls, text)
+        template.name = name
+        template.mtime = mtime
+        template.fields = cls.parse_fields(text, name)
+        return template
+
+    @staticmethod
+    def parse_fields(text: str, name: str) -> FrozenSet[str]:
+        """Return the placeholder names in text, raising ValueError if it is not a valid format string."""
+        try:
+            return frozenset(
+                field.split('.')[0].split('[')[0]
+                for _, field, _, _ in string.Formatter().parse(text)
+                if field
+            )
+        except ValueError as e:
+            raise ValueError(f"Invalid placeholders in template {name}: {str(e)}")
+
+    def format(self, *args, **kwargs) -> str:
+        # Numbered placeholders ({0}) are supplied by position
+        missing = self.fields - kwargs.keys() - {str(index) for index in range(len(args))}
+        if missing:
+            raise KeyError(f"Template {self.name} is missing values for: {sorted(missing)}")
+        return super().format(*args, **kwargs)
+
+class TemplateRegistry:
+    """Process-wide cache of every prompt template under PROMPTS_DIR.
+
+    All templates are read and validated on first use, and get() never
+    touches the filesystem after that. A background thread stat()s the files
+    once per refresh interval and re-reads a template only when its mtime
+    changes; a file that fails to read or validate is logged and the last
+    good version is kept.
+    """
+
+    def __init__(self, root: Path = PROMPTS_DIR, refresh_interval: float = TEMPLATE_REFRESH_INTERVAL):
+        self.root = Path(root)
+        self.refresh_interval = refresh_interval
+        self._templates: Dict[str, PromptTemplate] = {}
+        # mtimes of files that failed to load, so they are not retried until they change
+        self._failed: Dict[str, Optional[float]] = {}
+        self._loaded = False
+        self._watcher: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _key(self, path: Union[str, Path]) -> str:
+        path = Path(path)
+        if path.is_absolute():
+            path = path.relative_to(self.root)
+        return path.as_posix()
+
+    def load(self):
+        """Read every template and start the refresh watcher."""
+        with self._lock:
+            if self._loaded:
+                return
+            self._scan(force=True)
+            self._loaded = True
+            logger.info(f"Loaded {len(self._templates)} prompt templates from {self.root}")
+        self.watch()
+
+    def refresh(self):
+        """Re-read templates whose files changed, appeared or disappeared since they were loaded."""
+        with self._lock:
+            self._scan()
+
+    def _scan(self, force: bool = False):
+        # Caller holds self._lock
+        templates = dict(self._templates)
+        seen = set()
+        try:
+            paths = [path for path in self.root.rglob('*') if path.is_file() and path.suffix in TEMPLATE_SUFFIXES]
+        except OSError as e:
+            logger.error(f"Keeping previous prompt templates, cannot list {self.root}: {str(e)}")
+            return
+
+        for path in paths:
+            key = self._key(path)
+            seen.add(key)
+            current = templates.get(key)
+            mtime = None
+            try:
+                mtime = os.stat(path).st_mtime
+                if not force and (current is not None and mtime == current.mtime or mtime == self._failed.get(key)):
+                    continue
+                templates[key] = self._read(path)
+                self._failed.pop(key, None)
+                if not force:
+                    logger.info(f"Reloaded prompt template: {key}")
+            except (OSError, ValueError) as e:
+                self._failed[key] = mtime
+                logger.error(f"Keeping previous version of template {key}: {str(e)}")
+
+        for key in set(templates) - seen:
+            del templates[key]
+            logger.info(f"Dropped deleted prompt template: {key}")
+        for key in set(self._failed) - seen:
+            del self._failed[key]
+
+        self._templates = templates
+
+    def watch(self):
+        """Start the daemon thread that refreshes templates every refresh_interval seconds (0 disables it)."""
+        with self._lock:
+            if self._watcher is not None or self.refresh_interval <= 0:
+                return
+            self._watcher = threading.Thread(target=self._watch, name='prompt-template-watcher', daemon=True)
+            self._watcher.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing prompt templates: {str(e)}")
+
+    def get(self, path: Union[str, Path]) -> PromptTemplate:
+        """Return a template by its path (absolute, or relative to the prompts directory)."""
+        if not self._loaded:
+            self.load()
+
+        key = self._key(path)
+        try:
+            return self._templates[key]
+        except KeyError:
+            raise ValueError(f"Unknown prompt template: {key}")
+
+    def _read(self, path: Path) -> PromptTemplate:
+        mtime = os.stat(path).st_mtime
+        with open(path, 'r', encoding='utf-8') as f:
+            return PromptTemplate(f.read(), self._key(path), mtime)
+
+# Shared by every agent and generator in the process
+templates = TemplateRegistry()
@@ -1,25 +1,124 @@
 import aiohttp
+import asyncio
+import codecs
 import logging
-import re
+import time
+import weakref
 from typing import Optional
-from bs4 import BeautifulSoup
-from blogi.core.config import logger
+from blogi.core.config import (
+    logger,
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_REQUEST_TIMEOUT,
+    CACHE_DB_PATH,
+    HTTP_CACHE_ENABLED,
+    HTTP_CACHE_FRESH_FOR,
+    HTTP_CACHE_TTL,
+    HTTP_CACHE_MAX_ENTRIES,
+    HTTP_CACHE_MAX_BYTES,
+    HTML_MAX_BYTES,
+    HTML_CHUNK_SIZE
+)
+from blogi.core.extraction import create_extractor
+from blogi.utils.cache import SQLiteCache
+from blogi.utils.rate_limit import limiter_for_url
 from contextlib import asynccontextmanager
 
-class WebService:
+class _SharedSession:
+    """Reference-counted connection-pooled session for one event loop."""
+
     def __init__(self):
-        """Initialize the web service."""
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=HTTP_POOL_LIMIT,
+                limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+                use_dns_cache=True,
+                ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+                keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+                enable_cleanup_closed=True
+            ),
+            timeout=aiohttp.ClientTimeout(total=HTTP_REQUEST_TIMEOUT)
+        )
+        self.refs = 0
+
+# aiohttp sessions are bound to the loop they were created on, so the process
+# keeps one shared pool per running event loop
+_shared_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _SharedSession]" = (
+    weakref.WeakKeyDictionary()
+)
+
+async def acquire_shared_session() -> aiohttp.ClientSession:
+    """Return the pooled session for the running loop, creating it if needed."""
+    loop = asyncio.get_running_loop()
+    shared = _shared_sessions.get(loop)
+    if shared is None or shared.session.closed:
+        shared = _SharedSession()
+        _shared_sessions[loop] = shared
+        logger.info("Created shared HTTP session pool")
+    shared.refs += 1
+    return shared.session
+
+async def release_shared_session():
+    """Drop one reference to the running loop's pool and close it when unused."""
+    loop = asyncio.get_running_loop()
+    shared = _shared_sessions.get(loop)
+    if shared is None:
+        return
+    shared.refs -= 1
+    if shared.refs <= 0:
+        del _shared_sessions[loop]
+        if not shared.session.closed:
+            await shared.session.close()
+        logger.info("Closed shared HTTP session pool")
+
+class WebService:
+    def __init__(self, use_cache: bool = HTTP_CACHE_ENABLED):
+        """Initialize the web service.
+        Args:
+            use_cache (bool): Keep extracted page text on disk and revalidate it
+                with conditional requests instead of refetching
+        """
         self._session = None
+        self.cache = SQLiteCache(
+            CACHE_DB_PATH,
+            namespace="http",
+            ttl=HTTP_CACHE_TTL,
+            max_entries=HTTP_CACHE_MAX_ENTRIES,
+            max_bytes=HTTP_CACHE_MAX_BYTES
+        ) if use_cache else None
+
+    @property
+    def session(self) -> Optional[aiohttp.ClientSession]:
+        return self._session
+
+    async def start(self):
+        """Attach to the shared connection pool; pair with close()."""
+        if self._session is None or self._session.closed:
+            self._session = await acquire_shared_session()
+
+    async def close(self):
+        """Release this service's reference to the shared connection pool and close its cache."""
+        if self._session is not None:
+            self._session = None
+            await release_shared_session()
+        if self.cache:
+            self.cache.close()
+            self.cache = None
 
     @asynccontextmanager
     async def get_session(self):
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
-        try:
+        if self._session is not None and not self._session.closed:
             yield self._session
+            return
+
+        # Not started: borrow the shared pool for the duration of this call
+        session = await acquire_shared_session()
+        try:
+            yield session
         finally:
-            if self._session and not self._session.closed:
-                await self._session.close()
+            await release_shared_session()
 
     async def get(self, url: str) -> Optional[str]:
         """Make a GET request to the specified URL.
@@ -30,7 +129,7 @@ class WebService:
         """
         async with self.get_session() as session:
             try:
-                async with session.get(url) as response:
+                async with limiter_for_url(url).limit(), session.get(url) as response:
                     if response.status == 200:
                         return await response.text()
                     logger.error(f"HTTP error {response.status} for URL: {url}")
@@ -40,30 +139,66 @@ class WebService:
                 return None
 
     async def fetch_webpage_content(self, url: str) -> Optional[str]:
-        """Fetch and extract main content from a webpage."""
+        """Fetch and extract main content from a webpage.
+
+        Cached pages are returned directly while fresh and revalidated with
+        their ETag/Last-Modified validators once stale.
+        """
+        cache_key = SQLiteCache.make_key(url) if self.cache else None
+        cached = await asyncio.to_thread(self.cache.get, cache_key) if self.cache else None
+        if cached and time.time() - cached['fetched_at'] < HTTP_CACHE_FRESH_FOR:
+            logger.debug(f"Serving fresh cached page: {url}")
+            return cached['text']
+
         async with self.get_session() as session:
             try:
                 headers = {
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
                 }
-                async with session.get(url, headers=headers, timeout=30) as response:
+                if cached:
+                    if cached.get('etag'):
+                        headers['If-None-Match'] = cached['etag']
+                    if cached.get('last_modified'):
+                        headers['If-Modified-Since'] = cached['last_modified']
+
+                async with limiter_for_url(url).limit(), \
+                        session.get(url, headers=headers, timeout=30) as response:
+                    if response.status == 304 and cached:
+                        logger.debug(f"Page not modified, serving from cache: {url}")
+                        cached['fetched_at'] = time.time()
+                        await asyncio.to_thread(self.cache.set, cache_key, cached)
+                        return cached['text']
+
                     if response.status == 200:
-                        html = await response.text()
-                        soup = BeautifulSoup(html, 'html.parser')
-                        
-                        # Clean up the HTML
-                        for element in soup(["script", "style", "nav", "header", "footer"]):
-                            element.decompose()
-                        
-                        # Extract main content
-                        main_content = (
-                            soup.find('main') or 
-                            soup.find('article') or 
-                            soup.find('div', class_=re.compile(r'content|article|post'))
-                        )
-                        
-                        text = (main_content or soup).get_text(separator=' ', strip=True)
-                        return re.sub(r'\s+', ' ', text)[:10000]
+                        text = await self._extract_from_response(response)
+                        if self.cache and text and 'no-store' not in response.headers.get('Cache-Control', ''):
+                            await asyncio.to_thread(self.cache.set, cache_key, {
+                                'text': text,
+                                'etag': response.headers.get('ETag'),
+                                'last_modified': response.headers.get('Last-Modified'),
+                                'fetched_at': time.time()
+                            })
+                        return text
             except Exception as e:
                 logger.error(f"Error fetching webpage {url}: {str(e)}")
-                return None 
\ No newline at end of file
+                return None
+
+    async def _extract_from_response(self, response: aiohttp.ClientResponse) -> str:
+        """Stream the body into the extractor, stopping at HTML_MAX_BYTES or
+        as soon as enough main-content text has been collected."""
+        extractor = create_extractor()
+        try:
+            decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')(errors='replace')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+        received = 0
+        async for chunk in response.content.iter_chunked(HTML_CHUNK_SIZE):
+            chunk = chunk[:HTML_MAX_BYTES - received]
+            received += len(chunk)
+            if extractor.feed(decoder.decode(chunk)) or received >= HTML_MAX_BYTES:
+                break
+        else:
+            extractor.feed(decoder.decode(b'', final=True))
+
+        return extractor.result()
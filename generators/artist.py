@@ -1,20 +1,18 @@
 from datetime import datetime
 from typing import Tuple, Optional, Dict
-from pathlib import Path
-import os
-import json
 
 # Configure logging
-from blogi.core.config import logger, PROJECT_ROOT, filename_manager
+from blogi.core.config import logger, PROJECT_ROOT
+from blogi.core.templates import templates
 
 class ArtistPostGenerator:
     def __init__(self, agent):
         self.agent = agent
         self.image_service = None
         self.filename = None
+        self.templates = None
         
-    async def _load_templates(self) -> Dict[str, str]:
-        templates = {}
+    def _load_templates(self) -> Dict[str, str]:
         paths = {
             'agent_prompt': self.agent.agent_prompt_path,
             'enhanced_prompt': self.agent.enhanced_prompt_path,
@@ -23,96 +21,75 @@ class ArtistPostGenerator:
             'blog_template': self.agent.blog_page_template_path
         }
         
-        for name, path in paths.items():
-            content = await self.agent.read_file(str(path))
-            if not content:
-                raise ValueError(f"Failed to load template: {name}")
-            templates[name] = content
-            
-        return templates
+        return {name: templates.get(path) for name, path in paths.items()}
 
     async def generate_blog_post(self) -> Tuple[str, str]:
         """Generate a blog post with images.
         Returns:
             Tuple[str, str]: A tuple containing (filename, blog_page)
+        Raises:
+            RuntimeError: If no draft was generated; other errors are logged and re-raised
         """
         logger.info("\n=== Starting Blog Post Generation ===")
         try:
             logger.info("Loading templates...")
-            templates = await self._load_templates()
+            self.templates = self._load_templates()
             
             logger.info("Requesting blog content from AI...")
-            blog_content = await self.agent.anthropic.ask(
-                self._format_prompt(templates['agent_prompt'], templates['enhanced_prompt'])
-            )
+            blog_content = await self.agent.write_draft(self.build_draft_prompt())
             logger.info(f"Received blog content (length: {len(blog_content) if blog_content else 0} characters)")
             
             if not blog_content:
                 logger.error("Failed to generate blog content")
-                return "default.md", "Failed to generate content"
+                raise RuntimeError("Failed to generate content")
                 
             logger.info("Generating metadata...")
-            metadata = await self._generate_metadata(self.agent.image_prompt)
+            self.agent.emit('stage', stage='metadata')
+            metadata = await self._generate_metadata(self.metadata_source(blog_content))
             logger.info(f"Generated metadata: {metadata}")
             
-            self.filename = self._generate_filename(metadata['filename'])
-
-            logger.info("Generating image file paths...")
-            image_paths = await self._generate_image_file_paths()
-            
-            logger.info("Creating gallery code...")
-            gallery_code = self._create_gallery_code(image_paths)
-            
-            logger.info("Formatting pages...")
-            pages = self._format_pages(templates, metadata, blog_content, gallery_code)
-            
-            blog_page = pages['blog_page']
-            
-            # Save blog_content and filename to config.json
-            logger.info("Saving blog content and filename to config file...")
-            config_data = {
-                'blog_content': blog_content,
-                'filename': self.filename,
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            config_path = Path('tmp/config.json')
-            try:
-                # Create tmp directory if it doesn't exist
-                config_path.parent.mkdir(parents=True, exist_ok=True)
-                logger.info(f"Ensuring directory exists: {config_path.parent}")
-                
-                # Create or update the config file
-                with open(config_path, 'w', encoding='utf-8') as f:
-                    json.dump(config_data, f, ensure_ascii=False, indent=2)
-                logger.info(f"Saved blog content to config file: {config_path}")
-                
-                # Verify file was created
-                if config_path.exists():
-                    logger.info(f"Verified config file exists. Size: {config_path.stat().st_size} bytes")
-                else:
-                    logger.error(f"Failed to create config file at: {config_path.absolute()}")
-                    
-            except Exception as e:
-                logger.error(f"Failed to save config file: {str(e)}")
-                logger.error(f"Attempted to save at absolute path: {config_path.absolute()}")
-                logger.error(f"Current working directory: {Path.cwd()}")
-                raise  # Re-raise the exception for the outer try-catch block
+            filename, blog_page = await self.assemble_post(blog_content, metadata)
             
             logger.info(f"Blog post generation completed successfully. Filename: {self.filename}")
             logger.info("=== Blog Post Generation Completed ===\n")
             
-            return self.filename, blog_page
+            return filename, blog_page
             
         except Exception as e:
             logger.error("=== Blog Post Generation Failed ===")
             logger.error(f"Error generating artist post: {str(e)}", exc_info=True)
-            return "error.md", f"Error generating post: {str(e)}"
+            raise
 
-    async def _generate_image_file_paths(self) -> Dict[str, str]:
-        filename_manager.update(self.filename)
+    def build_draft_prompt(self) -> str:
+        return self._format_prompt(self.templates['agent_prompt'], self.templates['enhanced_prompt'])
+
+    def metadata_source(self, blog_content: str) -> str:
+        """Text the post metadata is generated from: the image prompt, not the draft."""
+        return self.agent.image_prompt
+
+    async def assemble_post(self, blog_content: str, metadata: Dict[str, str]) -> Tuple[str, str]:
+        """Build the final (filename, blog_page) from the draft and its metadata."""
+        self.filename = self._generate_filename(metadata['filename'])
+
+        logger.info("Generating image file paths...")
+        image_paths = await self._generate_image_file_paths()
+        
+        logger.info("Creating gallery code...")
+        gallery_code = self._create_gallery_code(image_paths)
+        
+        logger.info("Formatting pages...")
+        pages = self._format_pages(self.templates, metadata, blog_content, gallery_code)
+        
+        blog_page = pages['blog_page']
         
-        image_filename = filename_manager.filename.replace('.md', '')  # Remove .md extension
+        # Keep the draft for downstream stages (e.g. voice over)
+        logger.info("Saving blog content to the artifact store...")
+        self.agent.record_artifacts(self.filename, blog_content, metadata)
+        
+        return self.filename, blog_page
+
+    async def _generate_image_file_paths(self) -> Dict[str, str]:
+        image_filename = self.filename.replace('.md', '')  # Remove .md extension
         logger.info(f"SAVED IMAGE_FILENAME: {image_filename}")
         
         return {
@@ -123,19 +100,18 @@ class ArtistPostGenerator:
         }
     
     def _create_gallery_code(self, image_paths: Dict[str, str]) -> str:
-        return "{{< gallery images=\"" + ",".join(image_paths.values()) + "\" >}}"
+        # Responsive variants are listed next to the images by the webhook server (utils/image_slicing.py)
+        variants = f"/images/ai_images/{self.filename.replace('.md', '')}.variants.json"
+        return "{{< gallery images=\"" + ",".join(image_paths.values()) + "\" variants=\"" + variants + "\" >}}"
 
     def _format_prompt(self, agent_prompt: str, enhanced_prompt: str) -> str:
         formatted_prompt = agent_prompt.format(image_prompt=self.agent.image_prompt)
         return f"{formatted_prompt}\n\n{enhanced_prompt}"
 
     async def _generate_metadata(self, content: str) -> Dict[str, str]:
-        return {
-            'title': await self.agent.generate_title(content),
-            'tags': await self.agent.generate_tags(content),
-            'filename': await self.agent.generate_filename(content),
-            'date': datetime.now().strftime('%Y-%m-%d')
-        }
+        metadata = await self.agent.generate_metadata(content)
+        metadata['date'] = datetime.now().strftime('%Y-%m-%d')
+        return metadata
 
     def _format_pages(self, templates: Dict[str, str], metadata: Dict[str, str], 
                      content: str, gallery_code: str) -> Dict[str, str]:
@@ -1,16 +1,22 @@
 from datetime import datetime
 from typing import Tuple, Optional, List, Dict
+import asyncio
 import logging
 
 # Configure logging
-from blogi.core.config import logger
+from blogi.core.config import (
+    logger,
+    MAX_SEARCH_RESULTS,
+    RESEARCH_CONCURRENCY,
+    RESEARCH_SOURCE_TIMEOUT
+)
+from blogi.core.templates import templates
 
 class ResearcherPostGenerator:
     def __init__(self, agent):
         self.agent = agent
         
-    async def _load_templates(self) -> Dict[str, str]:
-        templates = {}
+    def _load_templates(self) -> Dict[str, str]:
         paths = {
             'agent_prompt': self.agent.agent_prompt_path,
             'enhanced_prompt': self.agent.enhanced_prompt_path,
@@ -20,69 +26,97 @@ class ResearcherPostGenerator:
             'summarize_content': self.agent.summarize_content_path
         }
         
-        for name, path in paths.items():
-            content = await self.agent.read_file(str(path))
-            if not content:
-                raise ValueError(f"Failed to load template: {name}")
-            templates[name] = content
-            
-        return templates
+        return {name: templates.get(path) for name, path in paths.items()}
 
     async def generate_blog_post(self) -> Tuple[str, str]:
         """Generate a research blog post.
         Returns:
             Tuple[str, str]: A tuple containing (filename, blog_page)
+        Raises:
+            RuntimeError: If no draft was generated; other errors are logged and re-raised
         """
         try:
             # Load templates and store them as instance variable
-            self.templates = await self._load_templates()
+            self.templates = self._load_templates()
             
-            async with self.agent.web_service.get_session() as session:
-                research_data = await self._gather_research()
-                
-                blog_content = await self.agent.anthropic.ask(
-                    self._format_prompt(self.templates['agent_prompt'], research_data)
-                )
-                
-                if not blog_content:
-                    return "default.md", "Failed to generate content"
-                    
-                metadata = await self._generate_metadata(blog_content)
-                pages = self._format_pages(self.templates, metadata, blog_content)
-                
-                filename = self._generate_filename(metadata['filename'])
-                blog_page = pages['blog_page']
-                
-                return filename, blog_page
+            self.agent.emit('stage', stage='research')
+            research_data = await self._gather_research()
+            
+            blog_content = await self.agent.write_draft(self.build_draft_prompt(research_data))
+            
+            if not blog_content:
+                raise RuntimeError("Failed to generate content")
                 
+            self.agent.emit('stage', stage='metadata')
+            metadata = await self._generate_metadata(blog_content)
+            return await self.assemble_post(blog_content, metadata)
+            
         except Exception as e:
             logger.error(f"Error generating researcher post: {str(e)}")
-            return "error.md", f"Error generating post: {str(e)}"
+            raise
 
     async def _gather_research(self) -> List[Dict]:
         try:
             search_results = await self.agent.brave_client.search(self.agent.topic)
-            research_data = []
-            
-            for result in search_results[:3]:
-                async with self.agent.web_service.get_session() as session:
-                    content = await self.agent.web_service.fetch_webpage_content(result['url'])
-                    if content:
-                        summary = await self.agent.anthropic.ask(
-                            self.templates['summarize_content'] + f"\n\n{content}"
-                        )
-                        research_data.append({
-                            'title': result.get('title', ''),
-                            'url': result.get('url', ''),
-                            'description': result.get('description', ''),
-                            'content_summary': summary
-                        })
-            
-            return research_data
+            semaphore = asyncio.Semaphore(RESEARCH_CONCURRENCY)
+
+            # gather() returns results in submission order, so the research
+            # summary keeps the original search ranking
+            results = await asyncio.gather(*[
+                self._research_source(result, semaphore)
+                for result in search_results[:MAX_SEARCH_RESULTS]
+            ])
+
+            return [data for data in results if data]
         except Exception as e:
             logger.error(f"Error in _gather_research: {str(e)}")
             raise
 
+    async def _research_source(self, result: Dict, semaphore: asyncio.Semaphore) -> Optional[Dict]:
+        """Fetch and summarize a single search result within the per-source deadline."""
+        url = result.get('url', '')
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(
+                    self._fetch_and_summarize(result),
+                    timeout=RESEARCH_SOURCE_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                logger.error(f"Research source timed out after {RESEARCH_SOURCE_TIMEOUT}s: {url}")
+            except Exception as e:
+                logger.error(f"Error researching source {url}: {str(e)}")
+            return None
+
+    async def _fetch_and_summarize(self, result: Dict) -> Optional[Dict]:
+        content = await self.agent.web_service.fetch_webpage_content(result['url'])
+        if not content:
+            return None
+
+        summary = await self.agent.anthropic.ask(self.build_summary_prompt(content))
+        return {
+            'title': result.get('title', ''),
+            'url': result.get('url', ''),
+            'description': result.get('description', ''),
+            'content_summary': summary
+        }
+
+    def build_summary_prompt(self, content: str) -> str:
+        return self.templates['summarize_content'] + f"\n\n{content}"
+
+    def build_draft_prompt(self, research_data: List[Dict]) -> str:
+        return self._format_prompt(self.templates['agent_prompt'], research_data)
+
+    def metadata_source(self, blog_content: str) -> str:
+        """Text the post metadata is generated from."""
+        return blog_content
+
+    async def assemble_post(self, blog_content: str, metadata: Dict[str, str]) -> Tuple[str, str]:
+        """Build the final (filename, blog_page) from the draft and its metadata."""
+        pages = self._format_pages(self.templates, metadata, blog_content)
+        filename = self._generate_filename(metadata['filename'])
+        self.agent.record_artifacts(filename, blog_content, metadata)
+        return filename, pages['blog_page']
+
     def _format_research_summary(self, research_data: List[Dict]) -> str:
         return "\n\n".join([
             f"Source: {data['title']}\n"
@@ -106,12 +140,9 @@ class ResearcherPostGenerator:
         return f"{formatted_agent_prompt}\n\n{formatted_enhanced_prompt}"
 
     async def _generate_metadata(self, content: str) -> Dict[str, str]:
-        return {
-            'title': await self.agent.generate_title(content),
-            'tags': await self.agent.generate_tags(content),
-            'filename': await self.agent.generate_filename(content),
-            'date': datetime.now().strftime('%Y-%m-%d')
-        }
+        metadata = await self.agent.generate_metadata(content)
+        metadata['date'] = datetime.now().strftime('%Y-%m-%d')
+        return metadata
 
     def _format_pages(self, templates: Dict[str, str], metadata: Dict[str, str], content: str) -> Dict[str, str]:
         frontmatter = templates['frontmatter'].format(
@@ -1,40 +1,287 @@
 import anthropic
-from anthropic import AI_PROMPT, HUMAN_PROMPT
 import aiohttp
-from typing import Optional
+import asyncio
+import inspect
+import random
+import weakref
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Callable, Mapping, Optional
 import logging
 import os
-from blogi.core.config import logger
+from blogi.core.config import (
+    logger,
+    CACHE_DB_PATH,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_TTL,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_MAX_BYTES,
+    ANTHROPIC_MAX_RETRIES,
+    ANTHROPIC_BACKOFF_BASE,
+    ANTHROPIC_BACKOFF_MAX
+)
+from blogi.utils.cache import SQLiteCache
+from blogi.utils.rate_limit import get_limiter
+
+SYSTEM_PROMPT = "You are a helpful assistant."
+DEFAULT_MAX_TOKENS = 300
+
+# 429 rate limited, 529 overloaded; both mean "slow down"
+THROTTLE_STATUS_CODES = {429, 529}
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+RATE_LIMIT_HEADERS = ('requests', 'tokens', 'input-tokens', 'output-tokens')
+# Stop reasons of a reply that was generated in full
+COMPLETE_STOP_REASONS = {'end_turn', 'stop_sequence'}
+
+class IncompleteStreamError(Exception):
+    """A streamed reply broke off after some text was already yielded."""
+
+# The SDK's HTTP client is bound to the loop it was created on, so the process
+# keeps one client (and connection pool) per running event loop
+_shared_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, anthropic.AsyncAnthropic]" = (
+    weakref.WeakKeyDictionary()
+)
+
+def shared_client() -> anthropic.AsyncAnthropic:
+    """Return the Anthropic client for the running loop, or a new one outside a loop."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Retries are handled in ask() so they can honor rate-limit headers
+        return anthropic.AsyncAnthropic(max_retries=0)
+
+    client = _shared_clients.get(loop)
+    if client is None or client.is_closed():
+        client = anthropic.AsyncAnthropic(max_retries=0)
+        _shared_clients[loop] = client
+    return client
 
 class AnthropicService:
-    def __init__(self, model: str):
+    def __init__(self, model: str, use_cache: bool = LLM_CACHE_ENABLED):
         """Initialize the Anthropic service.
         Args:
             model (str): The model to use for completions
+            use_cache (bool): Serve repeated prompts from the on-disk response cache
         """
         self.model = model
-        self.client = anthropic.AsyncAnthropic()
+        self.client = shared_client()
         self.session = None
+        self.cache = SQLiteCache(
+            CACHE_DB_PATH,
+            namespace="anthropic",
+            ttl=LLM_CACHE_TTL,
+            max_entries=LLM_CACHE_MAX_ENTRIES,
+            max_bytes=LLM_CACHE_MAX_BYTES
+        ) if use_cache else None
         self._is_closed = False
 
-    async def ask(self, prompt: str) -> str:
+    async def ask(self, prompt: str, max_tokens: int = DEFAULT_MAX_TOKENS) -> str:
         """Send a prompt to the Anthropic API using the Messages API."""
         if self._is_closed:
             raise RuntimeError("Service has been closed")
 
+        prompt = prompt.strip()
+        cache_key = None
+        if self.cache:
+            cache_key = SQLiteCache.make_key(self.model, SYSTEM_PROMPT, prompt, max_tokens)
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                logger.debug("Serving Anthropic response from cache")
+                return cached
+
+        limiter = get_limiter('anthropic')
+        for attempt in range(ANTHROPIC_MAX_RETRIES + 1):
+            try:
+                async with limiter.limit():
+                    raw_response = await self.client.messages.with_raw_response.create(
+                        model=self.model,
+                        system=SYSTEM_PROMPT,
+                        messages=[
+                            {"role": "user", "content": prompt},
+                        ],
+                        max_tokens=max_tokens
+                    )
+                limiter.on_success()
+                self._respect_remaining_quota(raw_response.headers, limiter)
+
+                # parse() is a coroutine on newer SDK releases
+                response = raw_response.parse()
+                if inspect.isawaitable(response):
+                    response = await response
+                text = response.content[0].text
+                if self.cache and text:
+                    await asyncio.to_thread(self.cache.set, cache_key, text)
+                return text
+            except (anthropic.APIStatusError, anthropic.APIConnectionError) as e:
+                status = getattr(e, 'status_code', None)
+                if status is not None and status not in RETRYABLE_STATUS_CODES:
+                    logger.error(f"Error in Anthropic API call: {str(e)}")
+                    return ""
+
+                headers = e.response.headers if status is not None else {}
+                delay = self._retry_delay(headers, attempt)
+                if status in THROTTLE_STATUS_CODES:
+                    limiter.on_throttle(delay)
+
+                if attempt == ANTHROPIC_MAX_RETRIES:
+                    logger.error(f"Error in Anthropic API call after {attempt + 1} attempts: {str(e)}")
+                    return ""
+                logger.warning(
+                    f"Anthropic API call failed ({status or type(e).__name__}), "
+                    f"retrying in {delay:.1f}s (attempt {attempt + 1}/{ANTHROPIC_MAX_RETRIES})"
+                )
+                await asyncio.sleep(delay)
+            except Exception as e:
+                logger.error(f"Error in Anthropic API call: {str(e)}")
+                return ""
+        return ""
+
+    async def stream(self, prompt: str, max_tokens: int = DEFAULT_MAX_TOKENS) -> AsyncIterator[str]:
+        """Stream the reply to a prompt as text deltas using the Messages streaming API.
+
+        Failures before the first delta are retried like ask(), and if they
+        persist the stream ends without yielding anything. Once text has been
+        yielded, a failure or a reply that did not finish (stop_reason other
+        than end_turn/stop_sequence) raises IncompleteStreamError. Only
+        complete replies are cached.
+        """
+        if self._is_closed:
+            raise RuntimeError("Service has been closed")
+
+        prompt = prompt.strip()
+        cache_key = None
+        if self.cache:
+            cache_key = SQLiteCache.make_key(self.model, SYSTEM_PROMPT, prompt, max_tokens)
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                logger.debug("Serving Anthropic response from cache")
+                yield cached
+                return
+
+        limiter = get_limiter('anthropic')
+        for attempt in range(ANTHROPIC_MAX_RETRIES + 1):
+            chunks = []
+            try:
+                async with limiter.limit():
+                    async with self.client.messages.stream(
+                        model=self.model,
+                        system=SYSTEM_PROMPT,
+                        messages=[
+                            {"role": "user", "content": prompt},
+                        ],
+                        max_tokens=max_tokens
+                    ) as stream:
+                        limiter.on_success()
+                        self._respect_remaining_quota(stream.response.headers, limiter)
+                        async for text in stream.text_stream:
+                            chunks.append(text)
+                            yield text
+                        stop_reason = (await stream.get_final_message()).stop_reason
+
+                if stop_reason not in COMPLETE_STOP_REASONS:
+                    raise IncompleteStreamError(f"Reply stopped early ({stop_reason})")
+                if self.cache and chunks:
+                    await asyncio.to_thread(self.cache.set, cache_key, "".join(chunks))
+                return
+            except IncompleteStreamError as e:
+                logger.error(f"Error in Anthropic streaming call: {str(e)}")
+                raise
+            except (anthropic.APIStatusError, anthropic.APIConnectionError) as e:
+                if chunks:
+                    logger.error(f"Anthropic stream broke off: {str(e)}")
+                    raise IncompleteStreamError(str(e)) from e
+                status = getattr(e, 'status_code', None)
+                if status is not None and status not in RETRYABLE_STATUS_CODES:
+                    logger.error(f"Error in Anthropic streaming call: {str(e)}")
+                    return
+
+                headers = e.response.headers if status is not None else {}
+                delay = self._retry_delay(headers, attempt)
+                if status in THROTTLE_STATUS_CODES:
+                    limiter.on_throttle(delay)
+
+                if attempt == ANTHROPIC_MAX_RETRIES:
+                    logger.error(f"Error in Anthropic streaming call after {attempt + 1} attempts: {str(e)}")
+                    return
+                logger.warning(
+                    f"Anthropic streaming call failed ({status or type(e).__name__}), "
+                    f"retrying in {delay:.1f}s (attempt {attempt + 1}/{ANTHROPIC_MAX_RETRIES})"
+                )
+                await asyncio.sleep(delay)
+            except Exception as e:
+                if chunks:
+                    logger.error(f"Anthropic stream broke off: {str(e)}")
+                    raise IncompleteStreamError(str(e)) from e
+                logger.error(f"Error in Anthropic streaming call: {str(e)}")
+                return
+
+    async def ask_streaming(self, prompt: str, on_text: Callable[[str], None],
+                            max_tokens: int = DEFAULT_MAX_TOKENS) -> str:
+        """Like ask(), but hands every text delta to on_text as it arrives.
+        Returns:
+            str: The complete reply, or "" if the request failed or the reply
+                was cut off (text already passed to on_text is discarded)
+        """
+        chunks = []
         try:
-            response = await self.client.messages.create(
-                model=self.model,
-                system="You are a helpful assistant.",
-                messages=[
-                    {"role": "user", "content": prompt.strip()},
-                ],
-                max_tokens=300
-            )
-            return response.content[0].text
-        except Exception as e:
-            logger.error(f"Error in Anthropic API call: {str(e)}")
+            async for text in self.stream(prompt, max_tokens):
+                chunks.append(text)
+                on_text(text)
+        except IncompleteStreamError:
             return ""
+        return "".join(chunks)
+
+    @staticmethod
+    def _seconds_until(timestamp: str) -> Optional[float]:
+        """Seconds until an RFC 3339 or HTTP-date timestamp (UTC if it has no offset), or None if unparseable."""
+        try:
+            when = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        except (TypeError, ValueError):
+            try:
+                when = parsedate_to_datetime(timestamp)
+            except (TypeError, ValueError):
+                return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        try:
+            return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, OverflowError):
+            return None
+
+    def _retry_delay(self, headers: Mapping[str, str], attempt: int) -> float:
+        """How long to wait before retrying: the server's retry-after or reset
+        time if given, otherwise full-jitter exponential backoff."""
+        retry_after = headers.get('retry-after')
+        if retry_after:
+            try:
+                return min(float(retry_after), ANTHROPIC_BACKOFF_MAX)
+            except ValueError:
+                seconds = self._seconds_until(retry_after)
+                if seconds is not None:
+                    return min(seconds, ANTHROPIC_BACKOFF_MAX)
+
+        resets = [
+            self._seconds_until(headers[f'anthropic-ratelimit-{kind}-reset'])
+            for kind in RATE_LIMIT_HEADERS
+            if headers.get(f'anthropic-ratelimit-{kind}-remaining') == '0'
+            and headers.get(f'anthropic-ratelimit-{kind}-reset')
+        ]
+        resets = [seconds for seconds in resets if seconds is not None]
+        if resets:
+            return min(max(resets), ANTHROPIC_BACKOFF_MAX)
+
+        return random.uniform(0, min(ANTHROPIC_BACKOFF_MAX, ANTHROPIC_BACKOFF_BASE * 2 ** attempt))
+
+    def _respect_remaining_quota(self, headers: Mapping[str, str], limiter):
+        """Pause the limiter until the window resets once a quota is used up,
+        instead of waiting for the next request to be rejected."""
+        for kind in RATE_LIMIT_HEADERS:
+            if headers.get(f'anthropic-ratelimit-{kind}-remaining') != '0':
+                continue
+            seconds = self._seconds_until(headers.get(f'anthropic-ratelimit-{kind}-reset', ''))
+            if seconds:
+                logger.warning(f"Anthropic {kind} quota exhausted, pausing for {seconds:.1f}s")
+                limiter.bucket.pause(seconds)
 
     async def cleanup(self):
         """Cleanup resources."""
@@ -47,6 +294,10 @@ class AnthropicService:
         except Exception as e:
             logger.error(f"Error during cleanup: {str(e)}")
         finally:
+            if self.cache:
+                logger.info(f"Anthropic response cache stats: {self.cache.stats}")
+                self.cache.close()
+                self.cache = None
             self._is_closed = True
             self.session = None
             self.client = None
@@ -1,16 +1,47 @@
 import os
+import asyncio
 import aiohttp
-from typing import Optional, List, Dict, Any
-from blogi.core.config import logger
+from typing import Optional, List, Dict, Any, Tuple
+from blogi.core.config import (
+    logger,
+    CACHE_DB_PATH,
+    BRAVE_CACHE_ENABLED,
+    BRAVE_CACHE_TTL,
+    BRAVE_CACHE_MAX_ENTRIES
+)
+from blogi.utils.cache import SQLiteCache
+from blogi.utils.rate_limit import get_limiter
+
+# Searches currently in flight, keyed by (event loop, cache key), so identical
+# concurrent queries share a single API request
+_in_flight: Dict[Tuple[asyncio.AbstractEventLoop, str], "asyncio.Future[List[Dict[str, Any]]]"] = {}
 
 class BraveSearchClient:
-    def __init__(self):
-        """Initialize the Brave Search client."""
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None,
+                 use_cache: bool = BRAVE_CACHE_ENABLED):
+        """Initialize the Brave Search client.
+        Args:
+            session (Optional[aiohttp.ClientSession]): Shared session to use; the
+                client only closes sessions it created itself
+            use_cache (bool): Serve repeated queries from the on-disk result cache
+        """
         self.api_key = os.getenv('BRAVE_API_KEY')
         if not self.api_key:
             raise ValueError("BRAVE_API_KEY not found in environment variables")
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = False
         self.base_url = "https://api.search.brave.com/res/v1/web/search"
+        self.cache = SQLiteCache(
+            CACHE_DB_PATH,
+            namespace="brave",
+            ttl=BRAVE_CACHE_TTL,
+            max_entries=BRAVE_CACHE_MAX_ENTRIES
+        ) if use_cache else None
+        self.coalesced = 0
+
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        return " ".join(query.lower().split())
 
     async def search(self, query: str) -> List[Dict[str, Any]]:
         """Perform a search using Brave Search API.
@@ -19,30 +50,71 @@ class BraveSearchClient:
         Returns:
             List[Dict[str, Any]]: List of search results
         """
-        if not self.session:
+        params = {
+            "q": query,
+            "count": 10
+        }
+        cache_key = SQLiteCache.make_key(
+            self._normalize_query(query),
+            {name: value for name, value in params.items() if name != "q"}
+        )
+
+        if self.cache:
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                logger.info(f"Serving Brave results from cache for: {query}")
+                return cached
+
+        in_flight_key = (asyncio.get_running_loop(), cache_key)
+        pending = _in_flight.get(in_flight_key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch(params, cache_key))
+            _in_flight[in_flight_key] = pending
+            pending.add_done_callback(lambda _: _in_flight.pop(in_flight_key, None))
+        else:
+            self.coalesced += 1
+            logger.info(f"Joining in-flight Brave search for: {query}")
+
+        # shield() keeps one caller's cancellation from cancelling the shared request
+        return await asyncio.shield(pending)
+
+    async def _fetch(self, params: Dict[str, Any], cache_key: str) -> List[Dict[str, Any]]:
+        if not self.session or self.session.closed:
             self.session = aiohttp.ClientSession()
+            self._owns_session = True
         try:
             headers = {
                 "Accept": "application/json",
                 "X-Subscription-Token": self.api_key
             }
-            params = {
-                "q": query,
-                "count": 10
-            }
 
-            async with self.session.get(self.base_url, headers=headers, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data.get('web', {}).get('results', [])
-                else:
-                    logger.error(f"Brave Search API error: {response.status}")
-                    return []
+            async with get_limiter('brave').limit():
+                async with self.session.get(self.base_url, headers=headers, params=params) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        results = data.get('web', {}).get('results', [])
+                        if self.cache and results:
+                            await asyncio.to_thread(self.cache.set, cache_key, results)
+                        return results
+                    else:
+                        logger.error(f"Brave Search API error: {response.status}")
+                        return []
         except Exception as e:
             logger.error(f"Error in Brave search: {str(e)}")
             return []
 
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Cache hit rate and number of searches served by an in-flight request."""
+        stats = self.cache.stats if self.cache else {'hits': 0, 'misses': 0, 'hit_rate': 0.0}
+        return {**stats, 'coalesced': self.coalesced}
+
     async def cleanup(self):
         """Cleanup resources."""
-        if self.session and not self.session.closed:
-            await self.session.close()
\ No newline at end of file
+        if self.cache:
+            logger.info(f"Brave search cache stats: {self.stats}")
+            self.cache.close()
+            self.cache = None
+        if self._owns_session and self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
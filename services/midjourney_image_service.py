@@ -1,32 +1,60 @@
-import os
-import requests
-import time
-import logging
-from datetime import datetime
+import random
+import asyncio
+import threading
+from typing import Dict, Optional
+
+import aiohttp
 
 # Configure logging
 from blogi.core.config import (
     logger, 
     USERAPI_AI_API_BASE_URL, 
-    filename_manager, 
     MIDJOURNEY_ASPECT_RATIO,
-    chaos_percentage_manager  # Replace MIDJOURNEY_CHAOS_PERCENTAGE with this
+    MIDJOURNEY_CHAOS_PERCENTAGE,
+    MIDJOURNEY_SUBMIT_TIMEOUT,
+    MIDJOURNEY_MAX_RETRIES,
+    MIDJOURNEY_BACKOFF_BASE,
+    MIDJOURNEY_BACKOFF_MAX,
+    MIDJOURNEY_MAX_CONCURRENT_PER_ACCOUNT
 )
+from blogi.core.web_service import acquire_shared_session, release_shared_session
+from blogi.utils.rate_limit import CrossLoopSemaphore, get_limiter
+
+# POST /imagine is not idempotent: a request that reached userapi may already
+# have started a (paid) job, so only rejections that say it did not are retried
+RETRYABLE_STATUS_CODES = {429, 503}
+
+_account_slots: Dict[str, CrossLoopSemaphore] = {}
+_account_slots_lock = threading.Lock()
+
+def account_slots(account_hash: Optional[str]) -> CrossLoopSemaphore:
+    """Return the process-wide cap on concurrent submissions for one userapi account."""
+    with _account_slots_lock:
+        slots = _account_slots.get(account_hash)
+        if slots is None:
+            slots = CrossLoopSemaphore(MIDJOURNEY_MAX_CONCURRENT_PER_ACCOUNT)
+            _account_slots[account_hash] = slots
+        return slots
 
 class MidjourneyImageService:
     # Add API base URL as a class constant
 
-    def __init__(self, api_key, account_hash, prompt, webhook_url):
+    def __init__(self, api_key, account_hash, prompt, webhook_url, image_filename,
+                 chaos_percentage=MIDJOURNEY_CHAOS_PERCENTAGE):
+        """
+        Args:
+            image_filename (str): Base name the webhook server saves this job's images under
+            chaos_percentage (str): Midjourney --chaos value for this job
+        """
         self.api_key = api_key
         self.account_hash = account_hash
         
-        # Use the chaos_percentage_manager instead of the constant
-        prompt = f"{prompt} --ar {MIDJOURNEY_ASPECT_RATIO} --chaos {chaos_percentage_manager.chaos_percentage}"
+        prompt = f"{prompt} --ar {MIDJOURNEY_ASPECT_RATIO} --chaos {chaos_percentage}"
         self.prompt = prompt
 
-        # Add timestamp to webhook URL as query parameter
+        # Pass the image filename to the webhook as a query parameter
         webhook_base = webhook_url.rstrip('/') + '/imagine/webhook'
-        image_filename = filename_manager.filename.replace('.md', '') # Remove .md extension
+        image_filename = image_filename.replace('.md', '') # Remove .md extension
         self.webhook_url = f"{webhook_base}?image_filename={image_filename}"
         logger.info(f"INIT MidjourneyImageService WITH WEBHOOK URL: {self.webhook_url}")
         self.headers = {
@@ -61,7 +89,15 @@ class MidjourneyImageService:
         logger.info(f"Image generation task initiated with hash: {response_hash}")
 
     async def _generate_quad_image_async(self):
-        """Make the initial request to generate a QUAD image asynchronously"""
+        """Submit the QUAD image request on the shared connection pool.
+
+        Only failures that mean no job was created are retried: connection
+        errors before the request was sent and 429/503 responses, with
+        jittered exponential backoff (or the server's retry-after) up to
+        MIDJOURNEY_MAX_RETRIES times. A timeout or dropped connection after
+        the request was sent is raised, since resubmitting could start a
+        second job for the same image_filename.
+        """
         
         logger.info(f"Make the initial request to generate a QUAD image WITH WEBHOOK URL: {self.webhook_url}")
         
@@ -74,14 +110,58 @@ class MidjourneyImageService:
         }
         logger.info(f"\n\n++++++++++++\n\npayload: {payload}\n\n++++++++++++\n\n")
         
-        response = requests.post(
-            f"{USERAPI_AI_API_BASE_URL}/imagine",
-            headers=self.headers,
-            json=payload,
-            timeout=30
-        )
-        logger.info(f"\n\n++++++++++++\n\nresponse: {response}\n\n++++++++++++\n\n")
-        
-        
-        response.raise_for_status()
-        return response.json()
\ No newline at end of file
+        limiter = get_limiter('userapi')
+        slots = account_slots(self.account_hash)
+        timeout = aiohttp.ClientTimeout(total=MIDJOURNEY_SUBMIT_TIMEOUT)
+        session = await acquire_shared_session()
+        try:
+            for attempt in range(MIDJOURNEY_MAX_RETRIES + 1):
+                retry_after = None
+                await slots.acquire()
+                try:
+                    async with limiter.limit():
+                        async with session.post(
+                            f"{USERAPI_AI_API_BASE_URL}/imagine",
+                            headers=self.headers,
+                            json=payload,
+                            timeout=timeout
+                        ) as response:
+                            logger.info(f"\n\n++++++++++++\n\nresponse: {response.status}\n\n++++++++++++\n\n")
+                            if response.status not in RETRYABLE_STATUS_CODES:
+                                response.raise_for_status()
+                                limiter.on_success()
+                                return await response.json()
+
+                            error = f"HTTP {response.status}"
+                            retry_after = self._retry_after(response.headers.get('retry-after'))
+                            if response.status == 429:
+                                limiter.on_throttle(retry_after)
+                except aiohttp.ClientConnectorError as e:
+                    # Could not connect, so nothing was submitted
+                    error = str(e) or type(e).__name__
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    raise RuntimeError(
+                        f"Image generation request failed after it was sent, not retrying: {str(e) or type(e).__name__}"
+                    ) from e
+                finally:
+                    slots.release()
+
+                if attempt == MIDJOURNEY_MAX_RETRIES:
+                    raise RuntimeError(f"Image generation request failed after {attempt + 1} attempts: {error}")
+                delay = retry_after if retry_after is not None else random.uniform(
+                    0, min(MIDJOURNEY_BACKOFF_MAX, MIDJOURNEY_BACKOFF_BASE * 2 ** attempt)
+                )
+                logger.warning(
+                    f"Image generation request failed ({error}), "
+                    f"retrying in {delay:.1f}s (attempt {attempt + 1}/{MIDJOURNEY_MAX_RETRIES})"
+                )
+                await asyncio.sleep(delay)
+        finally:
+            await release_shared_session()
+
+    @staticmethod
+    def _retry_after(value: Optional[str]) -> Optional[float]:
+        try:
+            return min(float(value), MIDJOURNEY_BACKOFF_MAX) if value else None
+        except ValueError:
+            return None
@@ -0,0 +1,123 @@
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Configure logging
+from blogi.core.config import logger, ARTIFACT_DB_PATH
+
+# Columns callers may set through save(); everything else is managed here
+ARTIFACT_FIELDS = ('job_id', 'agent_type', 'title', 'content', 'metadata', 'filepath', 'image_prompt')
+
+class ArtifactStore:
+    """Per-post generation artifacts (draft content, metadata, paths) in SQLite.
+
+    Posts are keyed by their filename without the .md extension, which is
+    also the name their images are saved under, and are indexed by job id
+    and creation time. Unlike SQLiteCache nothing is evicted.
+    """
+
+    def __init__(self, db_path: Path = ARTIFACT_DB_PATH):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS artifacts (
+                    post_key TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    job_id TEXT,
+                    agent_type TEXT,
+                    title TEXT,
+                    content TEXT,
+                    metadata TEXT,
+                    filepath TEXT,
+                    image_prompt TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS artifacts_job ON artifacts (job_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS artifacts_created ON artifacts (created_at)")
+
+    @staticmethod
+    def post_key(filename: str) -> str:
+        """Key a post by its filename, with or without directory and .md extension."""
+        name = Path(filename).name
+        return name[:-3] if name.endswith('.md') else name
+
+    def save(self, filename: str, **fields: Any):
+        """Create or update the artifacts of a post; fields left out keep their stored value."""
+        unknown = set(fields) - set(ARTIFACT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown artifact fields: {sorted(unknown)}")
+        if 'metadata' in fields:
+            fields['metadata'] = json.dumps(fields['metadata'], ensure_ascii=False)
+
+        now = time.time()
+        columns = list(fields)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO artifacts (post_key, filename, created_at, updated_at"
+                f"{''.join(', ' + column for column in columns)}) "
+                f"VALUES (?, ?, ?, ?{', ?' * len(columns)}) "
+                f"ON CONFLICT (post_key) DO UPDATE SET updated_at = excluded.updated_at"
+                f"{''.join(f', {column} = excluded.{column}' for column in columns)}",
+                (self.post_key(filename), Path(filename).name, now, now, *fields.values())
+            )
+
+    def get(self, filename: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM artifacts WHERE post_key = ?", (self.post_key(filename),)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def for_job(self, job_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM artifacts WHERE job_id = ? ORDER BY created_at", (job_id,)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM artifacts ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def delete(self, filename: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM artifacts WHERE post_key = ?", (self.post_key(filename),))
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        artifact = dict(row)
+        if artifact['metadata']:
+            artifact['metadata'] = json.loads(artifact['metadata'])
+        return artifact
+
+    def close(self):
+        try:
+            with self._lock:
+                self._conn.close()
+        except Exception as e:
+            logger.error(f"Error closing artifact store {self.db_path}: {str(e)}")
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+def get_artifact_store() -> ArtifactStore:
+    """Return the process-wide artifact store, opening it on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore()
+        return _store
@@ -0,0 +1,123 @@
+import re
+import json
+import uuid
+import argparse
+from datetime import datetime, timezone
+from flask import Flask, Response, jsonify, request
+
+# Local stand-in for the Message Batches endpoints used by core/batch.py.
+# Run it and point the batch client at it:
+#   python utils/batch_api_stub.py --port 8765
+#   ANTHROPIC_BATCH_BASE_URL=http://127.0.0.1:8765 python your_backfill.py
+
+app = Flask(__name__)
+batches = {}
+POLLS_BEFORE_END = 1
+# Same custom_id rule as the real API, so ids it would reject fail here too
+CUSTOM_ID_PATTERN = re.compile(r'^[a-zA-Z0-9_-]{1,64}$')
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+def _reply_for(custom_id, params):
+    """Canned completion: metadata requests get the JSON the metadata prompt asks for."""
+    if custom_id.endswith('-metadata'):
+        item_key = custom_id[:-len('-metadata')]
+        return json.dumps({
+            "title": f"Stub title for {item_key}",
+            "tags": ["stub", "batch"],
+            "five_words": f"stub batch post {item_key}"
+        })
+    prompt = params['messages'][-1]['content']
+    return f"Stub response for {custom_id} ({len(prompt)} prompt characters)"
+
+def _invalid_request(message):
+    return jsonify({"type": "error", "error": {"type": "invalid_request_error", "message": message}}), 400
+
+def _batch_body(batch):
+    ended = batch['polls'] >= POLLS_BEFORE_END
+    total = len(batch['requests'])
+    return {
+        "id": batch['id'],
+        "type": "message_batch",
+        "processing_status": "ended" if ended else "in_progress",
+        "request_counts": {
+            "processing": 0 if ended else total,
+            "succeeded": total if ended else 0,
+            "errored": 0,
+            "canceled": 0,
+            "expired": 0
+        },
+        "created_at": batch['created_at'],
+        "expires_at": batch['created_at'],
+        "ended_at": _now() if ended else None,
+        "archived_at": None,
+        "cancel_initiated_at": None,
+        "results_url": f"{request.host_url}v1/messages/batches/{batch['id']}/results" if ended else None
+    }
+
+@app.route('/v1/messages/batches', methods=['POST'])
+def create_batch():
+    requests = request.get_json()['requests']
+    seen = set()
+    for index, entry in enumerate(requests):
+        custom_id = entry.get('custom_id', '')
+        if not CUSTOM_ID_PATTERN.match(custom_id):
+            return _invalid_request(f"requests.{index}.custom_id: String should match pattern '{CUSTOM_ID_PATTERN.pattern}'")
+        if custom_id in seen:
+            return _invalid_request(f"requests.{index}.custom_id: duplicate custom_id '{custom_id}'")
+        seen.add(custom_id)
+
+    batch_id = f"msgbatch_{uuid.uuid4().hex}"
+    batches[batch_id] = {
+        'id': batch_id,
+        'requests': requests,
+        'created_at': _now(),
+        'polls': 0
+    }
+    print(f"Created {batch_id} with {len(batches[batch_id]['requests'])} requests")
+    return jsonify(_batch_body(batches[batch_id]))
+
+@app.route('/v1/messages/batches/<batch_id>', methods=['GET'])
+def retrieve_batch(batch_id):
+    batch = batches.get(batch_id)
+    if not batch:
+        return jsonify({"type": "error", "error": {"type": "not_found_error", "message": batch_id}}), 404
+    batch['polls'] += 1
+    return jsonify(_batch_body(batch))
+
+@app.route('/v1/messages/batches/<batch_id>/results', methods=['GET'])
+def batch_results(batch_id):
+    batch = batches.get(batch_id)
+    if not batch:
+        return jsonify({"type": "error", "error": {"type": "not_found_error", "message": batch_id}}), 404
+
+    lines = []
+    for entry in batch['requests']:
+        lines.append(json.dumps({
+            "custom_id": entry['custom_id'],
+            "result": {
+                "type": "succeeded",
+                "message": {
+                    "id": f"msg_{uuid.uuid4().hex}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": entry['params']['model'],
+                    "content": [{"type": "text", "text": _reply_for(entry['custom_id'], entry['params'])}],
+                    "stop_reason": "end_turn",
+                    "stop_sequence": None,
+                    "usage": {"input_tokens": 0, "output_tokens": 0}
+                }
+            }
+        }))
+    return Response("\n".join(lines) + "\n", mimetype='application/binary')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Local stub of the Anthropic Message Batches API')
+    parser.add_argument('--port', type=int, default=8765,
+                       help='Port to listen on (default: 8765)')
+    parser.add_argument('--polls', type=int, default=1,
+                       help='Status checks before a batch reports "ended" (default: 1)')
+    args = parser.parse_args()
+    POLLS_BEFORE_END = args.polls
+    app.run(host='127.0.0.1', port=args.port)
@@ -0,0 +1,204 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Configure logging
+from blogi.core.config import logger, CACHE_EVICT_INTERVAL
+
+class SQLiteCache:
+    """Persistent key/value cache backed by a single SQLite file.
+
+    Entries are grouped by namespace so several caches can share one database.
+    Each namespace has its own TTL and is trimmed in least-recently-used order
+    once it grows past max_entries or max_bytes. Trimming runs every
+    evict_interval writes, so a namespace can briefly exceed its limits.
+    """
+
+    def __init__(self, db_path: Path, namespace: str, ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 evict_interval: int = CACHE_EVICT_INTERVAL):
+        self.db_path = Path(db_path)
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evict_interval = max(1, evict_interval)
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS cache_lru ON cache (namespace, accessed_at)"
+            )
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a stable cache key from arbitrary JSON-serializable parts."""
+        raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+
+            if row is None or (row[1] is not None and row[1] <= now):
+                if row is not None:
+                    self._conn.execute(
+                        "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                        (self.namespace, key)
+                    )
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key)
+            )
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store value under key, trimming the namespace every evict_interval writes."""
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache "
+                "(namespace, key, value, size, created_at, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, payload, len(payload), now,
+                 now + ttl if ttl else None, now)
+            )
+            self._maybe_evict(now)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Store value under key only if it is missing or expired.
+
+        The check and the write are one statement, so exactly one caller wins
+        even across threads and processes sharing the database. Returns True
+        if this call stored the value.
+        """
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO cache "
+                "(namespace, key, value, size, created_at, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (namespace, key) DO UPDATE SET "
+                "value = excluded.value, size = excluded.size, created_at = excluded.created_at, "
+                "expires_at = excluded.expires_at, accessed_at = excluded.accessed_at "
+                "WHERE cache.expires_at IS NOT NULL AND cache.expires_at <= ?",
+                (self.namespace, key, payload, len(payload), now,
+                 now + ttl if ttl else None, now, now)
+            )
+            added = cursor.rowcount == 1
+            if added:
+                self._maybe_evict(now)
+            return added
+
+    def delete(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            )
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+
+    def _maybe_evict(self, now: float):
+        """Count a write and run _evict() once every evict_interval writes."""
+        self._writes += 1
+        if self._writes >= self.evict_interval:
+            self._writes = 0
+            self._evict(now)
+
+    def _evict(self, now: float):
+        """Drop expired entries, then least-recently-used ones until within limits."""
+        self._conn.execute(
+            "DELETE FROM cache WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+            (self.namespace, now)
+        )
+
+        if self.max_entries:
+            self._conn.execute("""
+                DELETE FROM cache WHERE namespace = ? AND key IN (
+                    SELECT key FROM cache WHERE namespace = ?
+                    ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.namespace, self.namespace, self.max_entries))
+
+        if self.max_bytes:
+            total = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM cache WHERE namespace = ?",
+                (self.namespace,)
+            ).fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._conn.execute(
+                    "SELECT key, size FROM cache WHERE namespace = ? ORDER BY accessed_at ASC",
+                    (self.namespace,)
+                ).fetchall()
+                stale_keys = []
+                for key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    stale_keys.append((self.namespace, key))
+                    total -= size
+                self._conn.executemany(
+                    "DELETE FROM cache WHERE namespace = ? AND key = ?", stale_keys
+                )
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for this instance and the namespace size."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache WHERE namespace = ?",
+                (self.namespace,)
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'namespace': self.namespace,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'bytes': size
+        }
+
+    def close(self):
+        try:
+            with self._lock:
+                self._conn.close()
+        except Exception as e:
+            logger.error(f"Error closing cache {self.db_path}: {str(e)}")
@@ -0,0 +1,207 @@
+import json
+import threading
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image, features
+
+# Configure logging
+from blogi.core.config import (
+    logger,
+    IMAGE_SLICE_WORKERS,
+    IMAGE_THUMBNAIL_PERCENT,
+    IMAGE_THUMBNAIL_REDUCING_GAP,
+    IMAGE_VARIANT_WIDTHS,
+    IMAGE_VARIANT_FORMATS
+)
+
+POSITIONS = ('tl', 'tr', 'bl', 'br')
+
+# Pillow format names for the output formats
+PIL_FORMATS = {'avif': 'AVIF', 'webp': 'WEBP', 'png': 'PNG'}
+
+def quadrant_boxes(width: int, height: int) -> List[Tuple[int, int, int, int]]:
+    """Crop boxes of the four quadrants, in POSITIONS order."""
+    quad_width = width // 2
+    quad_height = height // 2
+    return [
+        (0, 0, quad_width, quad_height),                    # Top-left
+        (quad_width, 0, width, quad_height),                # Top-right
+        (0, quad_height, quad_width, height),               # Bottom-left
+        (quad_width, quad_height, width, height)            # Bottom-right
+    ]
+
+def thumbnail_size(size: Tuple[int, int]) -> Tuple[int, int]:
+    width, height = size
+    return (width * IMAGE_THUMBNAIL_PERCENT // 100, height * IMAGE_THUMBNAIL_PERCENT // 100)
+
+def variant_sizes(size: Tuple[int, int]) -> List[Tuple[int, int]]:
+    """Sizes of the responsive variants of an image, keeping its aspect ratio.
+
+    Widths above the image's own are dropped and its own width is always included.
+    """
+    width, height = size
+    widths = sorted({w for w in IMAGE_VARIANT_WIDTHS if w < width} | {width})
+    return [(w, round(height * w / width)) for w in widths]
+
+def variant_formats() -> Dict[str, Dict[str, Any]]:
+    """IMAGE_VARIANT_FORMATS limited to the formats this Pillow build can encode."""
+    return {fmt: options for fmt, options in IMAGE_VARIANT_FORMATS.items() if features.check(fmt)}
+
+def save_image(image: Image.Image, output_path: str, size: Optional[Tuple[int, int]] = None,
+               fmt: str = 'png', options: Optional[Dict[str, Any]] = None) -> str:
+    """Save image in fmt, resized to size first if given.
+
+    Downscales are box-reduced by an integer factor before the final LANCZOS
+    pass (reducing_gap), which is much cheaper than a full-resolution
+    LANCZOS resize.
+    """
+    if size and size != image.size:
+        image = image.resize(size, Image.Resampling.LANCZOS, reducing_gap=IMAGE_THUMBNAIL_REDUCING_GAP)
+    image.save(output_path, format=PIL_FORMATS[fmt], **(options or {}))
+    return output_path
+
+def encode_outputs(image: Image.Image, outputs: List[Tuple[str, Any, str, Any]]) -> List[Optional[str]]:
+    """save_image() image once per (output path, size, format, options).
+
+    Returns one entry per output: None if it was saved, else the error message.
+    """
+    errors = []
+    for output_path, size, fmt, options in outputs:
+        try:
+            save_image(image, output_path, size, fmt, options)
+            errors.append(None)
+        except Exception as e:
+            errors.append(str(e) or type(e).__name__)
+    return errors
+
+def encode_quadrant(mode: str, image_size: Tuple[int, int], pixels: bytes,
+                    outputs: List[Tuple[str, Any, str, Any]]) -> List[Optional[str]]:
+    """encode_outputs() for a pool process: the quadrant arrives once, as raw pixels, for all its outputs."""
+    return encode_outputs(Image.frombytes(mode, image_size, pixels), outputs)
+
+def make_slice_pool(workers: int) -> ProcessPoolExecutor:
+    """A process pool for slice_grid.
+
+    Workers are started by a forkserver (or spawned) rather than forked, since
+    the pool is usually created from a thread of a multi-threaded server and
+    a forked child could inherit locks held by other threads.
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def get_slice_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the process-wide encoding pool, or None when IMAGE_SLICE_WORKERS is 1."""
+    global _pool
+    if IMAGE_SLICE_WORKERS <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = make_slice_pool(IMAGE_SLICE_WORKERS)
+            logger.info(f"Started image slicing pool with {IMAGE_SLICE_WORKERS} processes")
+        return _pool
+
+def shutdown_slice_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+def manifest_path(output_dir: Path, base_name: str) -> Path:
+    return Path(output_dir) / f"{base_name}.variants.json"
+
+def slice_grid(grid_path: Path, output_dir: Path, pool: Optional[Executor] = None,
+               variants: bool = True) -> List[Path]:
+    """Split a 2x2 grid into quadrant PNGs, thumbnails and responsive variants.
+
+    Each quadrant gets a full-size PNG, a PNG thumbnail and, unless variants
+    is False, a copy in every variant format at every variant width, listed
+    in <grid>.variants.json. The grid is decoded once and each quadrant is
+    sent to the pool (e.g. get_slice_pool()) once, as one task encoding all
+    of its outputs, or everything is encoded inline when pool is None.
+    Returns the paths written. A variant that fails is logged and left
+    out of the manifest; a quadrant PNG or thumbnail that fails raises
+    RuntimeError, since posts link to those directly.
+    """
+    grid_path = Path(grid_path)
+    output_dir = Path(output_dir)
+    base_name = grid_path.stem
+
+    with Image.open(grid_path) as img:
+        img.load()
+        quadrants = [img.crop(box) for box in quadrant_boxes(*img.size)]
+
+    formats = variant_formats() if variants else {}
+    # (output path, quadrant index, target size, format, encoder options)
+    tasks = []
+    for index, (quadrant, position) in enumerate(zip(quadrants, POSITIONS)):
+        name = f"{base_name}_{position}"
+        tasks.append((output_dir / f"{name}.png", index, None, 'png', None))
+        tasks.append((output_dir / f"{name}_thumb.png", index, thumbnail_size(quadrant.size), 'png', None))
+        for fmt, options in formats.items():
+            for size in variant_sizes(quadrant.size):
+                tasks.append((output_dir / f"{name}-{size[0]}w.{fmt}", index, size, fmt, options))
+
+    # One pool task per quadrant, so its pixels are sent once for all of its outputs
+    task_indices = [[i for i, task in enumerate(tasks) if task[1] == index] for index in range(len(quadrants))]
+    jobs = [[(str(tasks[i][0]), *tasks[i][2:]) for i in indices] for indices in task_indices]
+    if pool is None:
+        quadrant_errors = [encode_outputs(quadrant, outputs) for quadrant, outputs in zip(quadrants, jobs)]
+    else:
+        futures = [
+            pool.submit(encode_quadrant, quadrant.mode, quadrant.size, quadrant.tobytes(), outputs)
+            for quadrant, outputs in zip(quadrants, jobs)
+        ]
+        quadrant_errors = [_result(future, len(outputs)) for future, outputs in zip(futures, jobs)]
+
+    errors: List[Optional[str]] = [None] * len(tasks)
+    for indices, quadrant_error in zip(task_indices, quadrant_errors):
+        for i, error in zip(indices, quadrant_error):
+            errors[i] = error
+
+    saved = []
+    failed = []
+    for (path, _, _, fmt, _), error in zip(tasks, errors):
+        if error is None:
+            saved.append(path)
+            continue
+        logger.error(f"Error saving {path}: {error}")
+        if fmt == 'png':
+            failed.append(path.name)
+    logger.info(f"Saved {len(saved)}/{len(tasks)} slices and variants of {grid_path.name}")
+    if failed:
+        raise RuntimeError(f"Failed to save {', '.join(failed)} from {grid_path.name}")
+    if variants:
+        saved.append(write_manifest(output_dir, base_name, quadrants, tasks, set(saved)))
+    return saved
+
+def write_manifest(output_dir: Path, base_name: str, quadrants: List[Image.Image], tasks, saved) -> Path:
+    """List each quadrant's size and its saved variants by format, smallest first."""
+    manifest = {'grid': base_name, 'images': {}}
+    for index, (quadrant, position) in enumerate(zip(quadrants, POSITIONS)):
+        entries = {}
+        for path, task_index, size, fmt, _ in tasks:
+            if task_index == index and fmt in IMAGE_VARIANT_FORMATS and path in saved:
+                entries.setdefault(fmt, []).append({'file': path.name, 'width': size[0], 'height': size[1]})
+        manifest['images'][f"{base_name}_{position}.png"] = {
+            'width': quadrant.width,
+            'height': quadrant.height,
+            'variants': entries
+        }
+
+    path = manifest_path(output_dir, base_name)
+    path.write_text(json.dumps(manifest, indent=2))
+    return path
+
+def _result(future, count: int) -> List[Optional[str]]:
+    """A quadrant task's per-output errors; if the task itself failed, its error for every output."""
+    try:
+        return future.result()
+    except Exception as e:
+        return [str(e) or type(e).__name__] * count
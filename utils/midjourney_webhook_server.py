@@ -5,10 +5,13 @@ import os
 import requests
 from pathlib import Path
 import sys
+import time
+import queue
+import signal
+import atexit
+import threading
 from datetime import datetime
 
-from PIL import Image
-
 # Add the parent directory of the project root to Python path
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.append(str(PROJECT_ROOT.parent))
@@ -18,15 +21,42 @@ from blogi.core.config import (
     setup_logging, 
     logger, 
     BLOG_SITE_STATIC_IMAGES_PATH, 
-    OBSIDIAN_AI_IMAGES
+    OBSIDIAN_AI_IMAGES,
+    WEBHOOK_WORKERS,
+    WEBHOOK_QUEUE_MAX,
+    WEBHOOK_DRAIN_TIMEOUT,
+    WEBHOOK_IDEMPOTENCY_DB_PATH,
+    WEBHOOK_CLAIM_TIMEOUT,
+    WEBHOOK_IDEMPOTENCY_TTL,
+    WEBHOOK_IDEMPOTENCY_MAX_ENTRIES,
+    WEBHOOK_DOWNLOAD_CONNECT_TIMEOUT,
+    WEBHOOK_DOWNLOAD_READ_TIMEOUT,
+    WEBHOOK_DOWNLOAD_RETRIES,
+    WEBHOOK_DOWNLOAD_MAX_BYTES,
+    WEBHOOK_DOWNLOAD_CHUNK_SIZE
 )
+from blogi.utils.cache import SQLiteCache
+from blogi.utils.image_slicing import slice_grid, get_slice_pool, shutdown_slice_pool
 
 app = Flask(__name__)
 logger = setup_logging()
 
 class MidjourneyWebhookHandler:
-    def __init__(self):
-        self.processed_urls = set()  # Add cache for processed URLs
+    def __init__(self, db_path=WEBHOOK_IDEMPOTENCY_DB_PATH):
+        # Images processed, keyed by job hash (or image URL); trimmed LRU-first
+        self.processed = SQLiteCache(
+            db_path,
+            namespace="webhook",
+            ttl=WEBHOOK_IDEMPOTENCY_TTL,
+            max_entries=WEBHOOK_IDEMPOTENCY_MAX_ENTRIES
+        )
+        # Images queued or being processed. Kept apart from the records above so
+        # LRU trimming never drops an active claim; they expire after WEBHOOK_CLAIM_TIMEOUT
+        self.claims = SQLiteCache(db_path, namespace="webhook_claims", ttl=WEBHOOK_CLAIM_TIMEOUT)
+
+    @staticmethod
+    def idempotency_key(image_url, job_hash=None):
+        return job_hash or SQLiteCache.make_key(image_url)
 
     def verify_signature(self, payload, signature, secret):
         """Verify the webhook signature"""
@@ -38,55 +68,21 @@ class MidjourneyWebhookHandler:
         return hmac.compare_digest(expected_signature, signature)
 
     def slice_and_save_images(self, dated_ai_image_path):
-        """Slices an image into four equal-sized quadrants and creates thumbnails."""
+        """Slices an image into four equal-sized quadrants and creates thumbnails.
+
+        Raises if the grid cannot be sliced; the grid is deleted either way, so
+        a retried webhook downloads it again.
+        """
         try:
             logger.info(f"Slicing and saving images for dated_ai_image_path: {dated_ai_image_path}")
-
-            img = Image.open(dated_ai_image_path)
-            width, height = img.size
-            
-            # Calculate dimensions for each quadrant
-            quad_width = width // 2
-            quad_height = height // 2
-            
-            coordinates = [
-                (0, 0, quad_width, quad_height),                    # Top-left
-                (quad_width, 0, width, quad_height),                # Top-right
-                (0, quad_height, quad_width, height),               # Bottom-left
-                (quad_width, quad_height, width, height)            # Bottom-right
-            ]
-            
-            base_name = Path(dated_ai_image_path).stem
-            positions = ['tl', 'tr', 'bl', 'br']
-            
-            for coords, position in zip(coordinates, positions):
-                quadrant = img.crop(coords)
-                
-                # Save full-size quadrant
-                filename = f"{base_name}_{position}.png"
-                obsidian_output_path = OBSIDIAN_AI_IMAGES / filename
-                try:
-                    quadrant.save(obsidian_output_path)
-                    logger.info(f"Saved full-size: {obsidian_output_path}")
-                    
-                    # Create and save thumbnail (15% size)
-                    thumb_size = (quadrant.width * 15 // 100, quadrant.height * 15 // 100)
-                    thumbnail = quadrant.resize(thumb_size, Image.Resampling.LANCZOS)
-                    thumb_filename = f"{base_name}_{position}_thumb.png"
-                    thumb_path = OBSIDIAN_AI_IMAGES / thumb_filename
-                    thumbnail.save(thumb_path)
-                    logger.info(f"Saved thumbnail: {thumb_path}")
-                        
-                except Exception as e:
-                    logger.error(f"Error saving {obsidian_output_path}: {e}")
-            
-            # Close the image before deleting
-            img.close()
-            # Delete the original image
-            Path(dated_ai_image_path).unlink()
-            logger.info(f"Deleted original image: {dated_ai_image_path}")
+            slice_grid(dated_ai_image_path, OBSIDIAN_AI_IMAGES, pool=get_slice_pool())
         except Exception as e:
             logger.error(f"Error processing image: {e}")
+            raise
+        finally:
+            # Delete the original image
+            Path(dated_ai_image_path).unlink(missing_ok=True)
+            logger.info(f"Deleted original image: {dated_ai_image_path}")
 
     def save_prompt_to_file(self, prompt, prompt_file_path):
         """Save the prompt to a file."""
@@ -98,19 +94,65 @@ class MidjourneyWebhookHandler:
             logger.error(f"Error saving prompt to file: {e}")
 
     def download_image(self, image_url, download_path):
-        """Download an image from a URL."""
+        """Stream an image from a URL to download_path and return its SHA-256.
+
+        Chunks go to a .part file that is renamed into place once complete.
+        Failed attempts are retried, resuming with a Range request where the
+        server supports it; images over WEBHOOK_DOWNLOAD_MAX_BYTES are rejected.
+        """
+        download_path = Path(download_path)
+        part_path = download_path.with_name(download_path.name + '.part')
+        part_path.unlink(missing_ok=True)
+        logger.info(f"Downloading image from: {image_url}")
         try:
-            logger.info(f"Downloading image from: {image_url}")
-            response = requests.get(image_url)
-            response.raise_for_status()
-            Path(download_path).write_bytes(response.content)
-            logger.info("Image downloaded successfully")
+            for attempt in range(WEBHOOK_DOWNLOAD_RETRIES + 1):
+                try:
+                    digest = self._download_to(image_url, part_path)
+                    os.replace(part_path, download_path)
+                    logger.info(f"Image downloaded successfully ({download_path.stat().st_size} bytes, sha256 {digest})")
+                    return digest
+                except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                    if attempt == WEBHOOK_DOWNLOAD_RETRIES:
+                        raise
+                    delay = 2 ** attempt
+                    logger.warning(f"Image download interrupted ({e}), retrying in {delay}s")
+                    time.sleep(delay)
         except Exception as e:
             logger.error(f"Failed to download image: {e}")
+            part_path.unlink(missing_ok=True)
             raise
 
+    def _download_to(self, image_url, part_path):
+        """Fetch image_url into part_path, continuing after any bytes already there."""
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        headers = {'Range': f"bytes={offset}-"} if offset else {}
+        with requests.get(image_url, headers=headers, stream=True,
+                          timeout=(WEBHOOK_DOWNLOAD_CONNECT_TIMEOUT, WEBHOOK_DOWNLOAD_READ_TIMEOUT)) as response:
+            response.raise_for_status()
+            if offset and response.status_code != 206:
+                # Range ignored: start over
+                offset = 0
+            length = response.headers.get('Content-Length')
+            if length and offset + int(length) > WEBHOOK_DOWNLOAD_MAX_BYTES:
+                raise ValueError(f"Image is larger than {WEBHOOK_DOWNLOAD_MAX_BYTES} bytes")
+
+            digest = hashlib.sha256()
+            with open(part_path, 'r+b' if offset else 'wb') as f:
+                # Hash the bytes kept from an earlier attempt before appending
+                while f.tell() < offset:
+                    digest.update(f.read(min(WEBHOOK_DOWNLOAD_CHUNK_SIZE, offset - f.tell())))
+                f.truncate(offset)
+                size = offset
+                for chunk in response.iter_content(chunk_size=WEBHOOK_DOWNLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > WEBHOOK_DOWNLOAD_MAX_BYTES:
+                        raise ValueError(f"Image is larger than {WEBHOOK_DOWNLOAD_MAX_BYTES} bytes")
+                    f.write(chunk)
+                    digest.update(chunk)
+        return digest.hexdigest()
+
     def save_image_and_prompt(self, image_url, prompt, image_filename):
-        """Process and save the image and prompt."""
+        """Process and save the image and prompt; returns the image's SHA-256."""
         try:
             logger.info(f"Saving image and prompt for image_filename: {image_filename}")
             # Create directories if they don't exist
@@ -125,24 +167,190 @@ class MidjourneyWebhookHandler:
             }
 
             self.save_prompt_to_file(prompt, dated_obsidian_paths['prompt'])
-            self.download_image(image_url, dated_obsidian_paths['image'])
-            
+            digest = self.download_image(image_url, dated_obsidian_paths['image'])
+
+            # The same grid can arrive for the same post under a different URL or job hash.
+            # Claimed like a job until slicing succeeds, so a failure or crash does not block retries.
+            content_key = f"sha256:{image_filename}:{digest}"
+            content = {'image_url': image_url, 'image_filename': image_filename, 'sha256': digest}
+            if not self._claim(content_key, dict(content, status='processing')):
+                logger.info(f"Skipping duplicate image content {digest} for {image_filename} ({image_url})")
+                dated_obsidian_paths['image'].unlink(missing_ok=True)
+                return digest
+
             # Slice the image into quadrants
-            self.slice_and_save_images(dated_obsidian_paths['image'])
+            try:
+                self.slice_and_save_images(dated_obsidian_paths['image'])
+            except Exception:
+                self.claims.delete(content_key)
+                raise
+            self._complete(content_key, dict(content, status='done'))
+            return digest
             
         except Exception as e:
             logger.error(f"Error in save_image_and_prompt: {e}")
             raise
 
-    def has_been_processed(self, image_url):
-        """Check if the image URL has already been processed"""
-        return image_url in self.processed_urls
+    def _claim(self, key, value):
+        """Claim key unless it is done or already claimed; atomic across threads and processes."""
+        if self.processed.get(key) is not None or not self.claims.add(key, value):
+            return False
+        # Finished between the check and the claim (_complete records before releasing)
+        if self.processed.get(key) is not None:
+            self.claims.delete(key)
+            return False
+        return True
+
+    def _complete(self, key, value):
+        self.processed.set(key, value)
+        self.claims.delete(key)
+
+    def has_been_processed(self, image_url, job_hash=None):
+        """Check if the image has already been processed (or is being processed)"""
+        key = self.idempotency_key(image_url, job_hash)
+        return self.processed.get(key) is not None or self.claims.get(key) is not None
+
+    def claim(self, image_url, job_hash=None):
+        """Atomically claim an image for processing; returns False if it is already claimed or done."""
+        return self._claim(
+            self.idempotency_key(image_url, job_hash),
+            {'image_url': image_url, 'status': 'queued', 'claimed_at': datetime.now().isoformat()}
+        )
+
+    def start(self, image_url, job_hash=None):
+        """Renew the claim when a worker picks the image up, so WEBHOOK_CLAIM_TIMEOUT
+        counts from the start of processing rather than from when it was queued.
+        Returns False if the image was processed in the meantime."""
+        key = self.idempotency_key(image_url, job_hash)
+        if self.processed.get(key) is not None:
+            return False
+        self.claims.set(key, {'image_url': image_url, 'status': 'processing', 'started_at': datetime.now().isoformat()})
+        return True
+
+    def mark_as_processed(self, image_url, job_hash=None, sha256=None):
+        """Mark an image as processed"""
+        self._complete(
+            self.idempotency_key(image_url, job_hash),
+            {'image_url': image_url, 'status': 'done', 'sha256': sha256, 'processed_at': datetime.now().isoformat()}
+        )
+
+    def unmark(self, image_url, job_hash=None):
+        """Release a claim so a retried webhook can process the image again"""
+        self.claims.delete(self.idempotency_key(image_url, job_hash))
+
+class WebhookProcessor:
+    """Pool of worker threads that downloads and slices images after the webhook is acknowledged.
 
-    def mark_as_processed(self, image_url):
-        """Mark an image URL as processed"""
-        self.processed_urls.add(image_url)
+    submit() only enqueues; it raises queue.Full when the queue is at
+    WEBHOOK_QUEUE_MAX and RuntimeError once draining has started.
+    """
+
+    def __init__(self, handler, workers=WEBHOOK_WORKERS, max_queue=WEBHOOK_QUEUE_MAX):
+        self.handler = handler
+        self.workers = workers
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._accepting = True
+        self._busy = 0
+        self._processed = 0
+        self._failed = 0
+        self._total_seconds = 0.0
+        self._max_wait = 0.0
+        self._started_at = time.monotonic()
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for n in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f'webhook-worker-{n}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        logger.info(f"Webhook processor started with {self.workers} workers")
+
+    def submit(self, image_url, prompt, image_filename, job_hash=None):
+        if not self._accepting:
+            raise RuntimeError("Webhook processor is shutting down")
+        self.start()
+        self._queue.put_nowait((time.monotonic(), image_url, prompt, image_filename, job_hash))
+
+    def _worker(self):
+        while True:
+            task = self._queue.get()
+            if task is None:
+                self._queue.task_done()
+                return
+            queued_at, image_url, prompt, image_filename, job_hash = task
+            started = time.monotonic()
+            with self._lock:
+                self._busy += 1
+                self._max_wait = max(self._max_wait, started - queued_at)
+            ok = False
+            try:
+                if self.handler.start(image_url, job_hash):
+                    digest = self.handler.save_image_and_prompt(image_url, prompt, image_filename)
+                    self.handler.mark_as_processed(image_url, job_hash, digest)
+                else:
+                    logger.info(f"Skipping image processed while queued: {image_url}")
+                ok = True
+            except Exception as e:
+                logger.error(f"Failed to process image {image_url}: {e}")
+                self.handler.unmark(image_url, job_hash)
+                ok = False
+            finally:
+                elapsed = time.monotonic() - started
+                with self._lock:
+                    self._busy -= 1
+                    self._total_seconds += elapsed
+                    if ok:
+                        self._processed += 1
+                    else:
+                        self._failed += 1
+                self._queue.task_done()
+                logger.info(f"Processed {image_filename} in {elapsed:.1f}s ({'ok' if ok else 'failed'})")
+
+    def drain(self, timeout=WEBHOOK_DRAIN_TIMEOUT):
+        """Stop accepting webhooks, let queued work finish for up to timeout seconds, then stop the workers."""
+        with self._lock:
+            if not self._accepting:
+                return
+            self._accepting = False
+        deadline = time.monotonic() + timeout
+        logger.info(f"Draining webhook queue ({self._queue.qsize()} queued, {self._busy} in progress)")
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.1)
+        if self._queue.unfinished_tasks:
+            logger.warning(f"Webhook drain timed out with {self._queue.unfinished_tasks} tasks unfinished")
+        for _ in self._threads:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+
+    @property
+    def stats(self):
+        with self._lock:
+            finished = self._processed + self._failed
+            return {
+                'accepting': self._accepting,
+                'workers': self.workers,
+                'busy_workers': self._busy,
+                'queue_depth': self._queue.qsize(),
+                'queue_max': self._queue.maxsize,
+                'processed': self._processed,
+                'failed': self._failed,
+                'avg_processing_seconds': round(self._total_seconds / finished, 2) if finished else 0.0,
+                'max_queue_wait_seconds': round(self._max_wait, 2),
+                'idempotency_records': self.handler.processed.stats['entries'],
+                'active_claims': self.handler.claims.stats['entries'],
+                'uptime': round(time.monotonic() - self._started_at, 1)
+            }
 
 webhook_handler = MidjourneyWebhookHandler()
+webhook_processor = WebhookProcessor(webhook_handler)
 
 @app.route('/imagine/webhook', methods=['POST'])
 def webhook_handler_route():
@@ -156,18 +364,24 @@ def webhook_handler_route():
                 prompt = data.get('prompt') or data.get('result', {}).get('prompt') or "No prompt available"
                 # Get timestamp from URL query parameter instead of payload
                 image_filename = request.args.get('image_filename') or "0000000000"
+                job_hash = data.get('hash')
 
                 if image_url:
-                    # Check if we've already processed this URL
-                    if webhook_handler.has_been_processed(image_url):
+                    # Check if we've already processed (or queued) this job
+                    if not webhook_handler.claim(image_url, job_hash):
                         logger.info(f"Skipping already processed image: {image_url}")
                         return jsonify({'status': 'success', 'message': 'Already processed'}), 200
                     
                     logger.info(f"QUAD Image generation completed. URL: {image_url}")
                     logger.info(f"Using image_filename: {image_filename}")
-                    webhook_handler.save_image_and_prompt(image_url, prompt, image_filename)
-                    webhook_handler.mark_as_processed(image_url)
-                    return jsonify({'status': 'success', 'image_url': image_url}), 200
+                    try:
+                        webhook_processor.submit(image_url, prompt, image_filename, job_hash)
+                    except (queue.Full, RuntimeError) as e:
+                        # Let the provider retry once there is room
+                        webhook_handler.unmark(image_url, job_hash)
+                        logger.warning(f"Not accepting image {image_url}: {str(e) or 'queue full'}")
+                        return jsonify({'status': 'error', 'message': 'Busy, retry later'}), 503
+                    return jsonify({'status': 'queued', 'image_url': image_url}), 200
                 else:
                     logger.error("Image URL not found in response")
                     return jsonify({'status': 'error', 'message': 'Image URL not found'}), 400
@@ -183,5 +397,22 @@ def webhook_handler_route():
         logger.error(f"Error processing webhook: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/imagine/webhook/stats', methods=['GET'])
+def webhook_stats_route():
+    return jsonify(webhook_processor.stats)
+
+def shutdown(signum=None, frame=None):
+    """Finish queued image processing before the server exits."""
+    webhook_processor.drain()
+    shutdown_slice_pool()
+    if signum is not None:
+        sys.exit(0)
+
 if __name__ == '__main__':
+    # Start the slicing pool before any worker threads exist
+    get_slice_pool()
+    webhook_processor.start()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, shutdown)
+    atexit.register(shutdown)
     app.run(host='0.0.0.0', port=9119)
\ No newline at end of file
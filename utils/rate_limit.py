@@ -0,0 +1,212 @@
+import time
+import asyncio
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+# Configure logging
+from blogi.core.config import logger, RATE_LIMITS, RATE_LIMIT_HOSTS, RATE_LIMIT_BACKOFF_WINDOW
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second up to `burst` tokens.
+
+    State is guarded by a thread lock so one bucket can be shared by every
+    event loop in the process.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for the next `seconds` (e.g. after a retry-after).
+
+        The bucket is emptied and starts refilling only when the pause ends,
+        so requests resume at `rate` rather than in one burst.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+    async def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            await asyncio.sleep(wait)
+
+class CrossLoopSemaphore:
+    """Resizable semaphore that can be shared by coroutines on different event loops."""
+
+    def __init__(self, limit: int):
+        self._limit = limit
+        self._in_use = 0
+        self._lock = threading.Lock()
+        self._waiters = deque()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def resize(self, limit: int):
+        with self._lock:
+            self._limit = limit
+            self._wake()
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._in_use < self._limit and not self._waiters:
+                self._in_use += 1
+                return
+            waiter = loop.create_future()
+            self._waiters.append((loop, waiter))
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                if (loop, waiter) in self._waiters:
+                    self._waiters.remove((loop, waiter))
+            # Granted just before we were cancelled: hand the slot on
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            self._in_use -= 1
+            self._wake()
+
+    def _wake(self):
+        # Caller holds self._lock; the slot is reserved before the waiter runs
+        while self._waiters and self._in_use < self._limit:
+            loop, waiter = self._waiters.popleft()
+            if loop.is_closed():
+                continue
+            self._in_use += 1
+            loop.call_soon_threadsafe(self._grant, waiter)
+
+    def _grant(self, waiter: asyncio.Future):
+        if waiter.done():
+            # The waiter was cancelled after being picked; pass the slot on
+            self.release()
+        else:
+            waiter.set_result(None)
+
+class ServiceLimiter:
+    """Caps requests per second (token bucket) and concurrent requests for one service or host.
+
+    The concurrency cap adapts AIMD-style: throttling responses halve it (at
+    most once per RATE_LIMIT_BACKOFF_WINDOW), and each run of successes as
+    long as the current cap raises it by one, up to max_in_flight.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, max_in_flight: int):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.max_in_flight = max_in_flight
+        self._slots = CrossLoopSemaphore(max_in_flight)
+        self._successes = 0
+        self._last_throttle = 0.0
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.throttled = 0
+
+    @asynccontextmanager
+    async def limit(self):
+        """Hold a concurrency slot and spend one token for the duration of a request."""
+        await self._slots.acquire()
+        try:
+            await self.bucket.acquire()
+            with self._lock:
+                self.in_flight += 1
+            try:
+                yield self
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+        finally:
+            self._slots.release()
+
+    def on_success(self):
+        with self._lock:
+            self._successes += 1
+            if self._successes >= self._slots.limit and self._slots.limit < self.max_in_flight:
+                self._successes = 0
+                self._slots.resize(self._slots.limit + 1)
+                logger.info(f"Rate limiter {self.name}: concurrency raised to {self._slots.limit}")
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """Record a 429/overloaded response: pause the bucket and shrink concurrency."""
+        with self._lock:
+            self.throttled += 1
+            self._successes = 0
+            now = time.monotonic()
+            if now - self._last_throttle >= RATE_LIMIT_BACKOFF_WINDOW:
+                self._last_throttle = now
+                self._slots.resize(max(1, self._slots.limit // 2))
+                logger.warning(f"Rate limiter {self.name}: throttled, concurrency lowered to {self._slots.limit}")
+        if retry_after:
+            self.bucket.pause(retry_after)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'name': self.name,
+                'in_flight': self.in_flight,
+                'concurrency': self._slots.limit,
+                'max_in_flight': self.max_in_flight,
+                'waiting': self._slots.waiting,
+                'throttled': self.throttled,
+                'rate': self.bucket.rate
+            }
+
+_limiters: Dict[str, ServiceLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(name: str) -> ServiceLimiter:
+    """Return the process-wide limiter for a service or host declared in RATE_LIMITS.
+
+    Names without their own entry get a separate limiter using the "default" limits.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limits = RATE_LIMITS.get(name, RATE_LIMITS['default'])
+            limiter = ServiceLimiter(name, **limits)
+            _limiters[name] = limiter
+            logger.debug(f"Created rate limiter {name}: {limits}")
+        return limiter
+
+def limiter_for_url(url: str) -> ServiceLimiter:
+    """Return the limiter for a URL's service (see RATE_LIMIT_HOSTS) or its host."""
+    host = (urlparse(url).hostname or '').lower()
+    return get_limiter(RATE_LIMIT_HOSTS.get(host, f"host:{host}"))
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    with _limiters_lock:
+        return {name: limiter.stats for name, limiter in _limiters.items()}
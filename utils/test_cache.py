@@ -0,0 +1,50 @@
+import time
+import threading
+
+from blogi.utils.cache import SQLiteCache
+
+def test_add_is_exclusive_until_expiry(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.db", namespace="claims", ttl=0.2)
+
+    assert cache.add("job", "first")
+    assert not cache.add("job", "second")
+    assert cache.get("job") == "first"
+
+    time.sleep(0.3)
+    assert cache.add("job", "third")
+    assert cache.get("job") == "third"
+    cache.close()
+
+def test_add_after_expiry_has_one_winner_across_connections(tmp_path):
+    db_path = tmp_path / "cache.db"
+    caches = [SQLiteCache(db_path, namespace="claims", ttl=0.2) for _ in range(8)]
+    assert caches[0].add("job", "stale")
+    time.sleep(0.3)
+
+    results = []
+    barrier = threading.Barrier(len(caches))
+
+    def claim(cache: SQLiteCache, worker: int):
+        barrier.wait()
+        results.append((worker, cache.add("job", worker)))
+
+    threads = [threading.Thread(target=claim, args=(cache, n)) for n, cache in enumerate(caches)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    winners = [worker for worker, added in results if added]
+    assert len(winners) == 1
+    assert caches[0].get("job") == winners[0]
+    for cache in caches:
+        cache.close()
+
+def test_add_never_replaces_entry_without_ttl(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.db", namespace="processed")
+
+    assert cache.add("job", True)
+    time.sleep(0.05)
+    assert not cache.add("job", False)
+    assert cache.get("job") is True
+    cache.close()
@@ -0,0 +1,84 @@
+import time
+import asyncio
+
+from blogi.utils.rate_limit import CrossLoopSemaphore, TokenBucket
+
+async def _queue(semaphore: CrossLoopSemaphore, count: int):
+    """Start count acquire() tasks and wait until they are all queued."""
+    tasks = [asyncio.create_task(semaphore.acquire()) for _ in range(count)]
+    while semaphore.waiting < count:
+        await asyncio.sleep(0)
+    return tasks
+
+def test_waiter_cancelled_before_grant_runs_passes_slot_on():
+    async def main():
+        semaphore = CrossLoopSemaphore(1)
+        await semaphore.acquire()
+        first, second = await _queue(semaphore, 2)
+
+        # release() reserves the slot for `first`; cancel it before _grant runs
+        semaphore.release()
+        first.cancel()
+        await asyncio.wait_for(second, 1)
+        assert first.cancelled()
+        assert semaphore._in_use == 1
+
+    asyncio.run(main())
+
+def test_waiter_cancelled_after_grant_releases_slot():
+    async def main():
+        semaphore = CrossLoopSemaphore(1)
+        await semaphore.acquire()
+        (waiter,) = await _queue(semaphore, 1)
+
+        semaphore.release()
+        await asyncio.sleep(0)  # let _grant resolve the waiter's future
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert waiter.cancelled()
+        assert semaphore._in_use == 0
+
+        await asyncio.wait_for(semaphore.acquire(), 1)
+
+    asyncio.run(main())
+
+def test_resize_wakes_queued_waiters():
+    async def main():
+        semaphore = CrossLoopSemaphore(1)
+        await semaphore.acquire()
+        tasks = await _queue(semaphore, 3)
+
+        semaphore.resize(3)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert [task.done() for task in tasks] == [True, True, False]
+        assert semaphore._in_use == 3
+
+        # Shrinking below the slots in use holds the queue until enough are released
+        semaphore.resize(1)
+        semaphore.release()
+        semaphore.release()
+        await asyncio.sleep(0)
+        assert not tasks[2].done()
+
+        semaphore.release()
+        await asyncio.wait_for(tasks[2], 1)
+        assert semaphore._in_use == 1
+
+    asyncio.run(main())
+
+def test_token_bucket_does_not_burst_after_pause():
+    async def main():
+        rate, pause = 20.0, 0.1
+        bucket = TokenBucket(rate, burst=5)
+        bucket.pause(pause)
+
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        elapsed = time.monotonic() - start
+
+        # A burst would take ~pause; refilling from empty takes 5 / rate longer
+        assert elapsed >= pause + 4 / rate
+
+    asyncio.run(main())
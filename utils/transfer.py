@@ -0,0 +1,138 @@
+import os
+import time
+import errno
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Configure logging
+from blogi.core.config import logger, DEPLOY_TRANSFER_WORKERS, DEPLOY_TRANSFER_METHODS
+
+# Errors meaning a method cannot work between two filesystems (as opposed to a problem with one file)
+UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.EOPNOTSUPP, errno.ENOSYS}
+
+class TransferEngine:
+    """Copies files on a thread pool, linking instead of copying where it can.
+
+    Each file is tried with DEPLOY_TRANSFER_METHODS in order:
+      hardlink        - os.link, when source and destination share a filesystem;
+                        both names then refer to one file (opt-in)
+      copy_file_range - in-kernel copy, which reflinks on filesystems that support it
+      copy            - streaming copy (shutil.copyfile)
+    A method that fails between two devices is not tried for that pair again.
+    Files land under a temporary name and are renamed into place, and copies
+    keep the source's timestamps like shutil.copy2. Totals accumulate across
+    calls until reset().
+    """
+
+    def __init__(self, workers: int = DEPLOY_TRANSFER_WORKERS, methods: Iterable[str] = DEPLOY_TRANSFER_METHODS):
+        self.workers = workers
+        self.methods = [method for method in methods if method in self.METHODS]
+        self._unsupported: set = set()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.files = 0
+            self.bytes = 0
+            self.failed = 0
+            self.seconds = 0.0
+            self.by_method: Dict[str, int] = {}
+
+    def transfer_all(self, pairs: List[Tuple[Path, Path]]) -> List[Tuple[Path, Path]]:
+        """Transfer (source, destination) pairs in parallel; returns the pairs that succeeded."""
+        if not pairs:
+            return []
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(pairs))) as pool:
+            results = list(pool.map(lambda pair: self._transfer(*pair), pairs))
+        with self._lock:
+            self.seconds += time.perf_counter() - started
+        return [pair for pair, ok in zip(pairs, results) if ok]
+
+    def _transfer(self, source: Path, dest: Path) -> bool:
+        tmp_path = dest.with_name(f".{dest.name}.part")
+        try:
+            size = source.stat().st_size
+            devices = (source.stat().st_dev, dest.parent.stat().st_dev)
+            for method in self.methods:
+                with self._lock:
+                    if (method, devices) in self._unsupported:
+                        continue
+                try:
+                    tmp_path.unlink(missing_ok=True)
+                    self.METHODS[method](self, source, tmp_path)
+                except OSError as e:
+                    tmp_path.unlink(missing_ok=True)
+                    if method == self.methods[-1]:
+                        raise
+                    logger.debug(f"{method} not usable for {source.name}: {e}")
+                    if e.errno in UNSUPPORTED_ERRNOS:
+                        with self._lock:
+                            self._unsupported.add((method, devices))
+                    continue
+                if dest.exists() and os.path.samefile(tmp_path, dest):
+                    # Already a link to the source: rename() between two names
+                    # of one file is a no-op and would leave the .part behind
+                    tmp_path.unlink()
+                else:
+                    os.replace(tmp_path, dest)
+                with self._lock:
+                    self.files += 1
+                    self.bytes += size
+                    self.by_method[method] = self.by_method.get(method, 0) + 1
+                return True
+            raise OSError("no transfer method available")
+        except Exception as e:
+            logger.error(f"Failed to transfer {source} -> {dest}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            with self._lock:
+                self.failed += 1
+            return False
+
+    def _hardlink(self, source: Path, dest: Path):
+        os.link(source, dest)
+
+    def _copy_file_range(self, source: Path, dest: Path):
+        if not hasattr(os, 'copy_file_range'):
+            raise OSError(errno.ENOSYS, "copy_file_range is not available on this platform")
+        with open(source, 'rb') as src, open(dest, 'wb') as dst:
+            remaining = os.fstat(src.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if copied == 0:
+                    raise OSError("copy_file_range stopped before the end of the file")
+                remaining -= copied
+        shutil.copystat(source, dest)
+
+    def _copy(self, source: Path, dest: Path):
+        shutil.copyfile(source, dest)
+        shutil.copystat(source, dest)
+
+    METHODS = {
+        'hardlink': _hardlink,
+        'copy_file_range': _copy_file_range,
+        'copy': _copy
+    }
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'files': self.files,
+                'bytes': self.bytes,
+                'failed': self.failed,
+                'seconds': round(self.seconds, 3),
+                'by_method': dict(self.by_method)
+            }
+
+    def summary(self) -> str:
+        stats = self.stats
+        methods = ', '.join(f"{method} {count}" for method, count in stats['by_method'].items()) or 'none'
+        return (
+            f"{stats['files']} files, {stats['bytes'] / (1024 * 1024):.1f} MiB in {stats['seconds']:.2f}s "
+            f"({methods}; {stats['failed']} failed)"
+        )